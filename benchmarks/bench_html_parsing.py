@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the trending / Gitstar scrapers parsing on saved HTML fixtures.
+
+Compares the original full-page BeautifulSoup parsing with the region-based
+RowExtractor for every available backend (selectolax, lxml, bs4): median
+parse time, peak Python heap (tracemalloc) and process RSS growth.
+
+Usage:
+    python benchmarks/bench_html_parsing.py [--repeat 20] [--refresh]
+
+--refresh downloads the live pages into benchmarks/fixtures first.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+sys.path.insert(0, str(ROOT))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from src.services.html_extract import RowExtractor, available_backends  # noqa: E402
+
+PAGES = {
+    "trending": ("github_trending.html", "https://github.com/trending"),
+    "gitstar": ("gitstar_ranking.html", "https://gitstar-ranking.com/repositories"),
+}
+LIMIT = 25
+
+
+def legacy_trending(html: str, limit: int) -> list:
+    """Parsing used before RowExtractor: whole page tree, then CSS selects per row."""
+    soup = BeautifulSoup(html, 'html.parser')
+    rows = []
+    for repo in soup.select("article.Box-row")[:limit]:
+        name_elem = repo.select_one("h2 a")
+        if not name_elem or not name_elem.get('href'):
+            continue
+        desc_elem = repo.select_one("p")
+        lang_elem = repo.select_one("span[itemprop='programmingLanguage']")
+        stars_elem = repo.select_one("a[href$='/stargazers']")
+        rows.append({
+            "href": name_elem['href'],
+            "description": " ".join(desc_elem.text.split()) if desc_elem else "",
+            "language": " ".join(lang_elem.text.split()) if lang_elem else "",
+            "stars": " ".join(stars_elem.text.split()) if stars_elem else ""
+        })
+    return rows
+
+
+def legacy_gitstar(html: str, limit: int) -> list:
+    """Parsing used before RowExtractor for Gitstar."""
+    soup = BeautifulSoup(html, 'html.parser')
+    rows = []
+    for row in soup.select("table tbody tr")[:limit]:
+        name_elem = row.select_one("td:nth-child(2) a")
+        if not name_elem:
+            continue
+        stars_elem = row.select_one("td:nth-child(3)")
+        rows.append({
+            "href": name_elem["href"],
+            "name": " ".join(name_elem.text.split()),
+            "stars": " ".join(stars_elem.text.split()) if stars_elem else ""
+        })
+    return rows
+
+
+def make_parser(page: str, implementation: str):
+    """Return a callable parsing one page with one implementation."""
+    if implementation == "legacy":
+        return legacy_trending if page == "trending" else legacy_gitstar
+    extractor = RowExtractor(implementation)
+    return extractor.trending_rows if page == "trending" else extractor.gitstar_rows
+
+
+def max_rss_kb() -> int:
+    """Peak resident set size of this process in KB (0 when unsupported)."""
+    try:
+        import resource
+    except ImportError:
+        return 0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run_case(page: str, implementation: str, repeat: int) -> dict:
+    """Measure one (page, implementation) pair in the current process."""
+    html = (FIXTURES / PAGES[page][0]).read_text(encoding="utf-8")
+    parse = make_parser(page, implementation)
+
+    rss_before = max_rss_kb()
+    rows = parse(html, LIMIT)
+    rss_growth = max_rss_kb() - rss_before
+
+    tracemalloc.start()
+    parse(html, LIMIT)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        parse(html, LIMIT)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    return {
+        "page": page,
+        "implementation": implementation,
+        "rows": len(rows),
+        "rows_digest": json.dumps(rows, sort_keys=True),
+        "median_ms": statistics.median(timings),
+        "peak_heap_kb": peak / 1024,
+        "rss_growth_kb": rss_growth,
+    }
+
+
+def refresh_fixtures() -> None:
+    """Download the live pages into the fixtures directory."""
+    import requests
+
+    for filename, url in PAGES.values():
+        response = requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=15)
+        response.raise_for_status()
+        (FIXTURES / filename).write_text(response.text, encoding="utf-8")
+        print(f"Saved {url} -> {filename} ({len(response.text) // 1024} KB)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per case")
+    parser.add_argument("--refresh", action="store_true", help="Download live pages into the fixtures first")
+    parser.add_argument("--case", nargs=2, metavar=("PAGE", "IMPLEMENTATION"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        print(json.dumps(run_case(args.case[0], args.case[1], args.repeat)))
+        return
+
+    if args.refresh:
+        refresh_fixtures()
+
+    implementations = ["legacy"] + available_backends()
+    print(f"{'page':<10} {'implementation':<15} {'rows':>5} {'median ms':>10} {'speedup':>8} "
+          f"{'peak heap KB':>13} {'RSS growth KB':>14}  same rows")
+
+    for page in PAGES:
+        baseline = None
+        for implementation in implementations:
+            # Fresh interpreter per case so RSS growth is not shared between cases
+            output = subprocess.run(
+                [sys.executable, __file__, "--case", page, implementation, "--repeat", str(args.repeat)],
+                capture_output=True, text=True, check=True
+            ).stdout.strip().splitlines()[-1]
+            result = json.loads(output)
+            baseline = baseline or result
+            print(f"{page:<10} {implementation:<15} {result['rows']:>5} {result['median_ms']:>10.2f} "
+                  f"{baseline['median_ms'] / result['median_ms']:>7.1f}x {result['peak_heap_kb']:>13.0f} "
+                  f"{result['rss_growth_kb']:>14}  {result['rows_digest'] == baseline['rows_digest']}")
+
+
+if __name__ == "__main__":
+    main()
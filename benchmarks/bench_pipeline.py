@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Offline end-to-end benchmark of process_trending_repository.
+
+The HTTP calls of GitHubService and AIService (and the Ollama SDK calls)
+are served from recorded fixtures; Twitter posting and screenshots are
+stubbed, so a run never touches the network and never posts anything.
+Every run starts from an empty data directory (no history, candidate pool,
+cache or source health) and runs in its own interpreter.
+
+Usage:
+    python benchmarks/bench_pipeline.py --record          # one live run, saves fixtures
+    python benchmarks/bench_pipeline.py [--repeat 5] [--latency 0.05] [--recorded-latency]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "pipeline"
+
+# Stage boundaries, from the workflow log steps
+STAGES = [
+    ("fetch", "step_1_start", "step_1_success"),
+    ("screenshot", "step_2_start", "step_3_start"),
+    ("readme_ai", "step_3_start", "step_3_success"),
+    ("validation", "step_4_start", "tweets_validated"),
+]
+
+
+def run_case() -> dict:
+    """One pipeline run in the current process (settings come from the environment)."""
+    sys.path.insert(0, str(ROOT))
+    from src import main as pipeline
+    from src.core.http_client import get_http_client
+    from src.services.twitter_service import TwitterService
+
+    posted = []
+
+    class StubTwitterService(TwitterService):
+        """Builds the tweets like the real service but never posts them."""
+
+        def __init__(self):
+            self.client = None
+            self.firefox_service = None
+            self.last_post_channel = None
+
+        def create_tweet(self, text, media_path=None, use_firefox_fallback=True):
+            posted.append(text)
+            self.last_post_channel = "bench"
+            return f"bench-{len(posted)}"
+
+        def reply_to_tweet(self, tweet_id, text, use_firefox_fallback=True):
+            posted.append(text)
+            return f"bench-{len(posted)}"
+
+        def close_firefox(self):
+            pass
+
+    class StubScreenshotService:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, exc_type, exc_val, exc_tb):
+            return False
+
+        async def capture_repository(self, url, filename):
+            return None
+
+    pipeline.TwitterService = StubTwitterService
+    pipeline.ScreenshotService = StubScreenshotService
+
+    started = time.perf_counter()
+    asyncio.run(pipeline.process_trending_repository())
+    duration = time.perf_counter() - started
+
+    replay = get_http_client().replay
+    return {
+        "duration": duration,
+        "posted": len(posted),
+        "replay": replay.stats() if replay else {},
+    }
+
+
+def stage_durations(log_lines: list) -> dict:
+    """Seconds spent in each stage, from the JSON log timestamps."""
+    first_seen = {}
+    for line in log_lines:
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(entry, dict) and entry.get("step") and entry["step"] not in first_seen:
+            first_seen[entry["step"]] = datetime.fromisoformat(entry["timestamp"].replace("Z", "+00:00"))
+    return {
+        name: (first_seen[end] - first_seen[start]).total_seconds()
+        for name, start, end in STAGES
+        if start in first_seen and end in first_seen
+    }
+
+
+def run_subprocess(mode: str, latency: float, recorded_latency: bool) -> dict:
+    """Run one case in a fresh interpreter with its own empty data directory."""
+    with tempfile.TemporaryDirectory() as workdir:
+        env = dict(
+            os.environ,
+            HTTP_REPLAY_MODE=mode,
+            HTTP_REPLAY_DIR=str(FIXTURES),
+            HTTP_REPLAY_LATENCY=str(latency),
+            HTTP_REPLAY_RECORDED_LATENCY=str(recorded_latency).lower(),
+            DATA_DIR=str(Path(workdir) / "data"),
+            LOGS_DIR=str(Path(workdir) / "logs"),
+            SCREENSHOTS_DIR=str(Path(workdir) / "screenshots"),
+        )
+        output = subprocess.run(
+            [sys.executable, __file__, "--case"],
+            capture_output=True, text=True, check=True, env=env, cwd=workdir
+        ).stdout.strip().splitlines()
+    result = json.loads(output[-1])
+    result["stages"] = stage_durations(output[:-1])
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="Replayed runs")
+    parser.add_argument("--latency", type=float, default=0.0, help="Delay in seconds added to every replayed response")
+    parser.add_argument("--recorded-latency", action="store_true", help="Replay the latency measured when recording")
+    parser.add_argument("--record", action="store_true", help="Run once against the live services and save fixtures")
+    parser.add_argument("--case", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        print(json.dumps(run_case()))
+        return
+
+    if args.record:
+        FIXTURES.mkdir(parents=True, exist_ok=True)
+        result = run_subprocess("record", 0.0, False)
+        print(f"Recorded run: {result['duration']:.2f}s, {len(list(FIXTURES.glob('*.json')))} fixtures in {FIXTURES}")
+        return
+
+    if not FIXTURES.exists() or not any(FIXTURES.glob("*.json")):
+        sys.exit(f"No fixtures in {FIXTURES}, run with --record first")
+
+    results = [run_subprocess("replay", args.latency, args.recorded_latency) for _ in range(args.repeat)]
+    durations = [r["duration"] for r in results]
+    print(f"runs: {len(results)}  posted tweets/run: {results[-1]['posted']}  "
+          f"fixtures served/run: {results[-1]['replay'].get('served')}  missing/run: {results[-1]['replay'].get('missing')}")
+    print(f"{'stage':<12} {'median s':>9} {'min s':>8} {'max s':>8}")
+    for name, _, _ in STAGES + [("total", None, None)]:
+        values = durations if name == "total" else [r["stages"][name] for r in results if name in r["stages"]]
+        if values:
+            print(f"{name:<12} {statistics.median(values):>9.3f} {min(values):>8.3f} {max(values):>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
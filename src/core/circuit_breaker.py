@@ -0,0 +1,186 @@
+"""Per-source circuit breakers and health scores."""
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from .config import settings
+from .health_score import append_call, health_score, recent_calls
+from .logger import logger, log_step
+from .storage import atomic_write_json
+
+
+class SourceHealth:
+    """Circuit breaker (closed / open / half-open) and health score per source.
+
+    A source opens after ``failure_threshold`` consecutive failures and is
+    skipped until ``cooldown`` has passed; it is then probed once (half-open:
+    a single call is let through until its result is recorded) and closes
+    again on success. Health scores combine the rolling success
+    rate with the median latency over the last calls, ignoring calls older
+    than ``max_age`` so a demoted source gets its place back. State is
+    persisted between runs.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        state_file: Optional[str] = None,
+        failure_threshold: Optional[int] = None,
+        cooldown_seconds: Optional[float] = None,
+        window: Optional[int] = None,
+        max_age_hours: Optional[float] = None
+    ):
+        self.state_file = Path(state_file) if state_file else Path(settings.data_dir) / "source_health.json"
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        self.failure_threshold = failure_threshold or settings.source_breaker_failure_threshold
+        self.cooldown_seconds = cooldown_seconds or settings.source_breaker_cooldown_minutes * 60
+        self.window = window or settings.source_health_window
+        self.max_age_seconds = (max_age_hours or settings.source_health_max_age_hours) * 3600
+        self.sources: Dict[str, Dict[str, Any]] = {}
+        self._probing: Set[str] = set()  # Half-open sources whose probe call is in flight
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        """Load persisted breaker state."""
+        try:
+            if self.state_file.exists():
+                with open(self.state_file, 'r', encoding='utf-8') as f:
+                    self.sources = json.load(f)
+        except Exception as e:
+            logger.warning(
+                "Failed to load source health, starting fresh",
+                **log_step("source_health_load_error", error=str(e))
+            )
+            self.sources = {}
+
+    def _save(self) -> None:
+        """Persist breaker state."""
+        try:
+            atomic_write_json(self.state_file, self.sources, indent=2)
+        except Exception as e:
+            logger.warning(
+                "Failed to save source health",
+                **log_step("source_health_save_error", error=str(e))
+            )
+
+    def _source(self, name: str) -> Dict[str, Any]:
+        return self.sources.setdefault(name, {
+            'state': self.CLOSED,
+            'failures': 0,
+            'opened_at': 0,
+            'history': []
+        })
+
+    def state(self, name: str) -> str:
+        """Current breaker state, moving open breakers to half-open after the cooldown."""
+        with self._lock:
+            source = self._source(name)
+            if source['state'] == self.OPEN and time.time() - source['opened_at'] >= self.cooldown_seconds:
+                source['state'] = self.HALF_OPEN
+            return source['state']
+
+    def available(self, name: str) -> bool:
+        """True when the source may be called: not open, and no probe in flight if half-open."""
+        state = self.state(name)
+        if state == self.OPEN:
+            return False
+        with self._lock:
+            return state == self.CLOSED or name not in self._probing
+
+    def claim_probe(self, name: str) -> bool:
+        """
+        Take the probe slot of a half-open source, right before calling it.
+
+        The slot is released when the call result is recorded. Sources in
+        another state are not limited.
+
+        Returns:
+            False when the probe of this half-open source is already in flight
+        """
+        if self.state(name) != self.HALF_OPEN:
+            return True
+        with self._lock:
+            if name in self._probing:
+                return False
+            self._probing.add(name)
+            return True
+
+    def release_probe(self, name: str) -> None:
+        """Give back the probe slot of a call that was skipped, without recording a result."""
+        with self._lock:
+            self._probing.discard(name)
+
+    def record_success(self, name: str, latency: float) -> None:
+        """Record a successful call and close the breaker."""
+        with self._lock:
+            self._probing.discard(name)
+            source = self._source(name)
+            was_open = source['state'] != self.CLOSED
+            source['history'] = append_call(source['history'], True, latency, self.window)
+            source.update(state=self.CLOSED, failures=0)
+            self._save()
+        if was_open:
+            logger.info("Source circuit closed", **log_step("source_circuit_closed", source=name))
+
+    def record_failure(self, name: str, latency: float) -> None:
+        """Record a failed call, opening the breaker when the threshold is reached."""
+        with self._lock:
+            self._probing.discard(name)
+            source = self._source(name)
+            source['history'] = append_call(source['history'], False, latency, self.window)
+            source['failures'] += 1
+            opened = source['state'] == self.HALF_OPEN or (
+                source['state'] == self.CLOSED and source['failures'] >= self.failure_threshold
+            )
+            if opened:
+                source.update(state=self.OPEN, opened_at=time.time())
+            self._save()
+        if opened:
+            logger.warning(
+                "Source circuit opened",
+                **log_step("source_circuit_opened", source=name, failures=source['failures'],
+                           cooldown_minutes=round(self.cooldown_seconds / 60))
+            )
+
+    def score(self, name: str) -> float:
+        """Health score in [0, 1]: rolling success rate weighted by latency."""
+        return health_score(recent_calls(self.sources.get(name, {}).get('history', []), self.max_age_seconds))
+
+    def order(self, names: List[str]) -> List[str]:
+        """
+        Order sources by health score, skipping those with an open breaker
+        (or a half-open one whose probe is in flight). Listing a source does
+        not take its probe slot: callers claim it when they call the source.
+
+        When every breaker is open, the best scored source is still returned
+        so that a run is never left without any source.
+
+        Args:
+            names: Sources in order of preference (kept for equal scores)
+
+        Returns:
+            Sources to call, best first
+        """
+        allowed = [name for name in names if self.available(name)]
+        skipped = [name for name in names if name not in allowed]
+        if not allowed and names:
+            allowed = [max(names, key=self.score)]
+        if skipped:
+            logger.info(
+                "Skipping sources with open circuit",
+                **log_step("source_circuit_skip", skipped=skipped)
+            )
+        return sorted(allowed, key=lambda name: -round(self.score(name), 1))
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """State and score per source."""
+        return {
+            name: {'state': self.state(name), 'score': round(self.score(name), 3)}
+            for name in self.sources
+        }
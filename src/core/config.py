@@ -1,7 +1,7 @@
 """Configuration management with Pydantic."""
 from pydantic import Field
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -21,9 +21,15 @@ class Settings(BaseSettings):
     # Ollama
     ollama_host: str = Field("http://localhost:11434", description="Ollama host URL")
     ollama_model: str = Field("qwen3:14b", description="Ollama model name")
+    ollama_keep_alive: str = Field("30m", description="How long Ollama keeps the model loaded after a call ('30m', '2h', '-1' = forever)")
+    ollama_warmup: str = Field("auto", description="Load the Ollama model at startup: 'auto' (when Ollama is the first provider), 'always' or 'off'")
+    ollama_streaming: bool = Field(True, description="Stream Ollama answers and stop once the expected sentence or lines are complete")
     
     # GitHub
     github_token: Optional[str] = Field(None, description="GitHub API token (optional)")
+    readme_max_bytes: int = Field(16384, description="README download budget in bytes (0 = whole file)")
+    github_rate_low_watermark: int = Field(5, description="Remaining GitHub calls below which requests are paced or avoided")
+    github_pace_max_delay: float = Field(2.0, description="Max delay in seconds between paced GitHub calls")
     
     # OpenRouter (future use)
     openrouter_api_key: Optional[str] = Field(None, description="OpenRouter API key (optional)")
@@ -32,11 +38,66 @@ class Settings(BaseSettings):
     gemini_api_key: Optional[str] = Field(None, description="Google Gemini API key (optional)")
     mistral_api_key: Optional[str] = Field(None, description="Mistral API key (optional)")
     
+    # AI provider requests
+    ai_request_mode: str = Field("sequential", description="AI providers: 'sequential' (in order) or 'hedged' (race with delayed backups)")
+    ai_hedge_delay: float = Field(5.0, description="Seconds without answer before the next provider is started (0 = all at once)")
+    ai_latency_window: int = Field(50, description="Calls kept per provider and task for statistics and latency percentiles")
+    ai_provider_stats_max_age_hours: float = Field(24, description="Provider calls older than this are ignored when ordering providers")
+    ai_quota_cooldown_minutes: float = Field(60, description="Minutes a provider is skipped after a quota error without Retry-After")
+    ai_combined_generation: bool = Field(True, description="Get summary, features and self-check in one JSON call")
+    llm_cache_enabled: bool = Field(True, description="Reuse LLM answers to identical requests across runs")
+    llm_cache_ttl_hours: float = Field(72, description="Hours a cached LLM answer stays valid")
+    llm_cache_max_entries: int = Field(1000, description="Max LLM answers kept in cache (least recently used evicted)")
+    
+    # README distillation before prompting
+    readme_distill_max_chars: int = Field(800, description="Default character budget of a distilled README")
+    readme_distill_cache_entries: int = Field(500, description="Distilled READMEs kept in cache")
+    
     # App settings
     tweet_interval_hours: int = Field(4, description="Hours between tweets")
     max_trending_repos: int = Field(10, description="Max repos to fetch")
     screenshot_timeout: int = Field(30, description="Screenshot timeout in seconds")
     
+    # Shared HTTP client
+    http_pool_connections: int = Field(10, description="Number of per-host connection pools to keep")
+    http_pool_maxsize: int = Field(10, description="Max keep-alive connections per host")
+    http_http2: bool = Field(False, description="Use HTTP/2 when httpx[http2] is installed")
+    http_cache_enabled: bool = Field(True, description="Use the on-disk ETag cache for GitHub API calls")
+    http_cache_max_entries: int = Field(500, description="Max entries kept in the HTTP cache")
+    http_cache_max_bytes: int = Field(50_000_000, description="Max total size of the HTTP cache in bytes")
+    http_replay_mode: str = Field("off", description="HTTP fixtures: 'off', 'record' (save live responses) or 'replay' (serve them offline)")
+    http_replay_dir: str = Field("data/http_fixtures", description="Directory of recorded HTTP fixtures")
+    http_replay_latency: float = Field(0.0, description="Delay in seconds added to every replayed response")
+    http_replay_recorded_latency: bool = Field(False, description="Also replay the latency measured when recording")
+    
+    # Trending sources fetching
+    trending_crawl_periods: List[str] = Field(
+        ["daily", "weekly", "monthly"], description="Periods fetched in crawl mode"
+    )
+    trending_crawl_languages: List[str] = Field(
+        ["", "python", "typescript", "rust", "go"], description="GitHub Trending language slugs fetched in crawl mode ('' = all)"
+    )
+    trending_crawl_workers: int = Field(4, description="Parallel requests in crawl mode")
+    candidate_pool_low_water_mark: int = Field(5, description="Refill the candidate pool below this size")
+    candidate_pool_ttl_hours: int = Field(12, description="Hours a pooled candidate stays valid")
+    source_breaker_failure_threshold: int = Field(3, description="Consecutive failures opening a source circuit")
+    source_breaker_cooldown_minutes: int = Field(120, description="Minutes before an open source circuit is probed again")
+    source_health_window: int = Field(20, description="Calls kept per source for health scoring")
+    source_health_max_age_hours: float = Field(6, description="Calls older than this are ignored by health scoring")
+    star_velocity_window_hours: float = Field(24, description="Window used to compute star velocity and acceleration")
+    star_history_retention_days: int = Field(90, description="Days of star snapshots kept on compaction")
+    star_history_max_snapshots: int = Field(500_000, description="Snapshot count that triggers compaction")
+    html_parser_backend: str = Field("auto", description="Scraper parser backend: 'auto', 'selectolax', 'lxml' or 'bs4'")
+    trending_fetch_mode: str = Field(
+        "sequential",
+        description="How trending sources are queried: 'sequential', 'concurrent_first', 'concurrent_merge' or 'crawl'"
+    )
+    trending_fetch_deadline: float = Field(20.0, description="Deadline in seconds for concurrent trending fetch")
+    
+    # Posting history
+    history_backend: str = Field("sqlite", description="Posting history storage: 'sqlite' (WAL, indexed) or 'json'")
+    history_journal_max_entries: int = Field(100, description="JSON backend: journal lines before the snapshot is rewritten")
+    
     # Directories
     data_dir: str = Field("data", description="Data directory")
     logs_dir: str = Field("logs", description="Logs directory")
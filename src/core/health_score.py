@@ -0,0 +1,38 @@
+"""Rolling call statistics shared by the source circuit breakers and the AI provider registry.
+
+A call is stored as ``[ok, latency, timestamp]`` (ok is 1 or 0, latency in
+seconds, timestamp in unix seconds) so the lists serialize as JSON.
+"""
+import time
+from typing import List, Sequence
+
+# Latency (seconds) at which the latency factor of the score is halved
+REFERENCE_LATENCY = 10.0
+
+# Successful calls assumed for every caller, so one failure does not sink its score
+PRIOR_SUCCESSES = 3
+
+
+def append_call(calls: List[List[float]], ok: bool, latency: float, window: int) -> List[List[float]]:
+    """Return ``calls`` with one more call, keeping the last ``window``."""
+    return (calls + [[int(ok), round(latency, 3), int(time.time())]])[-window:]
+
+
+def recent_calls(calls: Sequence[List[float]], max_age_seconds: float) -> List[List[float]]:
+    """Calls made within the last ``max_age_seconds``."""
+    cutoff = time.time() - max_age_seconds
+    return [call for call in calls if call[2] >= cutoff]
+
+
+def success_rate(calls: Sequence[List[float]]) -> float:
+    """Success rate, smoothed by ``PRIOR_SUCCESSES``."""
+    successes = sum(ok for ok, _, _ in calls) + PRIOR_SUCCESSES
+    return successes / (len(calls) + PRIOR_SUCCESSES)
+
+
+def health_score(calls: Sequence[List[float]]) -> float:
+    """Score in [0, 1]: smoothed success rate weighted by the median latency (1.0 without calls)."""
+    if not calls:
+        return 1.0
+    latencies = sorted(latency for _, latency, _ in calls)
+    return success_rate(calls) / (1 + latencies[len(latencies) // 2] / REFERENCE_LATENCY)
@@ -0,0 +1,181 @@
+"""Persistent ETag / Last-Modified cache for conditional HTTP requests."""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from .config import settings
+from .logger import logger, log_step
+from .storage import atomic_write_json
+
+
+class HttpCache:
+    """On-disk conditional-request cache with LRU eviction.
+
+    Bodies are stored one file per entry next to an ``index.json`` that keeps
+    validators, LRU order and hit/miss counters. A 304 answer is served from
+    the stored body, which GitHub does not count against the rate limit.
+    """
+
+    # Response headers kept with each entry
+    STORED_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None
+    ):
+        self.cache_dir = Path(cache_dir) if cache_dir else Path(settings.data_dir) / "http_cache"
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.index_file = self.cache_dir / "index.json"
+        self.max_entries = max_entries or settings.http_cache_max_entries
+        self.max_bytes = max_bytes or settings.http_cache_max_bytes
+        self.entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._load_index()
+
+    def _load_index(self) -> None:
+        """Load cache index from disk."""
+        try:
+            if self.index_file.exists():
+                with open(self.index_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self.entries = OrderedDict(data.get('entries', []))
+                self.hits = data.get('hits', 0)
+                self.misses = data.get('misses', 0)
+        except Exception as e:
+            logger.warning(
+                "Failed to load HTTP cache index, starting empty",
+                **log_step("http_cache_load_error", error=str(e))
+            )
+            self.entries = OrderedDict()
+
+    def _save_index(self) -> None:
+        """Save cache index to disk."""
+        try:
+            data = {
+                'entries': list(self.entries.items()),
+                'hits': self.hits,
+                'misses': self.misses
+            }
+            atomic_write_json(self.index_file, data, ensure_ascii=False)
+        except Exception as e:
+            logger.warning(
+                "Failed to save HTTP cache index",
+                **log_step("http_cache_save_error", error=str(e))
+            )
+
+    def _body_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.body"
+
+    @staticmethod
+    def make_key(url: str, params: Optional[Dict[str, Any]] = None, variant: str = "") -> str:
+        """Build a cache key from URL, query parameters and a variant (e.g. media type)."""
+        query = json.dumps(params or {}, sort_keys=True, default=str)
+        return hashlib.sha256(f"{url}|{query}|{variant}".encode("utf-8")).hexdigest()
+
+    def validators(self, key: str) -> Dict[str, str]:
+        """Conditional request headers for a cached entry."""
+        with self._lock:
+            entry = self.entries.get(key)
+        if not entry:
+            return {}
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def load(self, key: str) -> Optional[requests.Response]:
+        """Rebuild a response from a cached entry and mark it as recently used."""
+        with self._lock:
+            entry = self.entries.get(key)
+            if not entry:
+                return None
+            try:
+                body = self._body_path(key).read_bytes()
+            except OSError:
+                self.entries.pop(key, None)
+                return None
+            self.entries.move_to_end(key)
+
+        response = requests.Response()
+        response.status_code = entry.get('status', 200)
+        response._content = body
+        response.headers = CaseInsensitiveDict(entry.get('headers', {}))
+        response.url = entry.get('url', '')
+        response.encoding = entry.get('encoding') or 'utf-8'
+        return response
+
+    def store(self, key: str, url: str, response: Any, body: Optional[bytes] = None) -> None:
+        """Store a response that carries an ETag or Last-Modified validator."""
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+        body = response.content if body is None else body
+        if len(body) > self.max_bytes:
+            return
+
+        with self._lock:
+            try:
+                self._body_path(key).write_bytes(body)
+            except OSError as e:
+                logger.warning("Failed to write HTTP cache entry", **log_step("http_cache_write_error", error=str(e)))
+                return
+            self.entries[key] = {
+                'url': url,
+                'etag': etag,
+                'last_modified': last_modified,
+                'status': response.status_code,
+                'encoding': response.encoding,
+                'headers': {h: response.headers[h] for h in self.STORED_HEADERS if h in response.headers},
+                'size': len(body)
+            }
+            self.entries.move_to_end(key)
+            self._evict()
+            self._save_index()
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until the cache fits its bounds."""
+        total = sum(entry.get('size', 0) for entry in self.entries.values())
+        evicted = 0
+        while self.entries and (len(self.entries) > self.max_entries or total > self.max_bytes):
+            key, entry = self.entries.popitem(last=False)
+            total -= entry.get('size', 0)
+            self._body_path(key).unlink(missing_ok=True)
+            evicted += 1
+        if evicted:
+            logger.info("HTTP cache entries evicted", **log_step("http_cache_evicted", count=evicted))
+
+    def record_hit(self, url: str) -> None:
+        """Count a response served from cache."""
+        with self._lock:
+            self.hits += 1
+            self._save_index()
+        logger.info("HTTP cache hit", **log_step("http_cache_hit", url=url, **self.stats()))
+
+    def record_miss(self, url: str) -> None:
+        """Count a response fetched from the network."""
+        with self._lock:
+            self.misses += 1
+        logger.info("HTTP cache miss", **log_step("http_cache_miss", url=url, **self.stats()))
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache counters and size."""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else 0.0,
+            'entries': len(self.entries)
+        }
@@ -0,0 +1,223 @@
+"""Shared pooled HTTP client for all outbound calls."""
+import threading
+import time
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .config import settings
+from .logger import logger, log_step
+from .http_cache import HttpCache
+from .http_replay import HttpReplay, read_limited
+
+try:
+    import httpx
+    import h2  # noqa: F401 - required by httpx for HTTP/2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class HttpClient:
+    """HTTP client with per-host connection pools and keep-alive.
+
+    A single ``requests.Session`` keeps one urllib3 pool per host, so repeated
+    calls to the same host reuse the TCP+TLS connection. When HTTP/2 is enabled
+    and ``httpx[http2]`` is installed, non-streaming calls are multiplexed over
+    an ``httpx`` client instead. An optional ``HttpReplay`` records every
+    response to fixtures or serves them back without any network access.
+    """
+
+    def __init__(
+        self,
+        pool_connections: Optional[int] = None,
+        pool_maxsize: Optional[int] = None,
+        http2: Optional[bool] = None,
+        cache: Optional[HttpCache] = None,
+        replay: Optional[HttpReplay] = None
+    ):
+        self.pool_connections = pool_connections or settings.http_pool_connections
+        self.pool_maxsize = pool_maxsize or settings.http_pool_maxsize
+        http2 = settings.http_http2 if http2 is None else http2
+        self.cache = cache
+        self.replay = replay
+        self._response_hooks: List[Callable[[Any], None]] = []
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._http2_client = None
+        if http2 and HTTP2_AVAILABLE:
+            self._http2_client = httpx.Client(
+                http2=True,
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=self.pool_connections * self.pool_maxsize,
+                    max_keepalive_connections=self.pool_maxsize
+                )
+            )
+        elif http2:
+            logger.warning(
+                "HTTP/2 requested but httpx[http2] is not installed, using HTTP/1.1",
+                **log_step("http2_unavailable")
+            )
+
+        logger.info(
+            "HTTP client ready",
+            **log_step("http_client_ready",
+                       pool_connections=self.pool_connections,
+                       pool_maxsize=self.pool_maxsize,
+                       http2=self._http2_client is not None)
+        )
+
+    def add_response_hook(self, hook: Callable[[Any], None]) -> None:
+        """Call ``hook`` with every network response (registered once)."""
+        if hook not in self._response_hooks:
+            self._response_hooks.append(hook)
+    
+    def request(
+        self,
+        method: str,
+        url: str,
+        max_bytes: Optional[int] = None,
+        relative_dates: bool = False,
+        **kwargs: Any
+    ) -> Any:
+        """
+        Send a request through the shared connection pools (or the replay fixtures).
+
+        With ``max_bytes`` the body is streamed and cut at that budget (see
+        get_limited), also while recording fixtures. ``relative_dates`` marks
+        query dates computed from now, keyed relative to today in fixtures.
+        """
+        if self.replay is not None and self.replay.replaying:
+            response = self.replay.load(method, url, max_bytes=max_bytes, relative_dates=relative_dates, **kwargs)
+        else:
+            started = time.time()
+            if self._http2_client is not None and not kwargs.get("stream"):
+                kwargs.pop("stream", None)
+                response = self._http2_client.request(method, url, **kwargs)
+            else:
+                response = self.session.request(method, url, **kwargs)
+            if self.replay is not None:
+                response = self.replay.save(
+                    method, url, response, time.time() - started,
+                    max_bytes=max_bytes, relative_dates=relative_dates, **kwargs
+                )
+            elif max_bytes:
+                read_limited(response, max_bytes)
+        
+        for hook in self._response_hooks:
+            try:
+                hook(response)
+            except Exception as e:
+                logger.warning("HTTP response hook failed", **log_step("http_hook_error", error=str(e)))
+        return response
+
+    def get(self, url: str, **kwargs: Any) -> Any:
+        """Send a GET request."""
+        return self.request("GET", url, **kwargs)
+
+    def cached_get(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        prefer_cache: bool = False,
+        max_bytes: Optional[int] = None,
+        **kwargs: Any
+    ) -> Any:
+        """
+        Send a conditional GET, serving 304 answers from the on-disk cache.
+        
+        Args:
+            url: Request URL
+            params: Query parameters
+            headers: Request headers (the Accept header is part of the cache key)
+            prefer_cache: Return a cached entry without revalidating it
+            max_bytes: Stop downloading the body after this many bytes (see get_limited)
+            
+        Returns:
+            Network or cached response
+        """
+        fetch = partial(self.get_limited, max_bytes=max_bytes) if max_bytes else self.get
+        if self.cache is None:
+            return fetch(url, params=params, headers=headers, **kwargs)
+        
+        headers = dict(headers or {})
+        variant = headers.get("Accept", "") + (f"|max_bytes={max_bytes}" if max_bytes else "")
+        key = self.cache.make_key(url, params, variant)
+        
+        if prefer_cache:
+            cached = self.cache.load(key)
+            if cached is not None:
+                self.cache.record_hit(url)
+                return cached
+        
+        response = fetch(url, params=params, headers={**headers, **self.cache.validators(key)}, **kwargs)
+        
+        if response.status_code == 304:
+            cached = self.cache.load(key)
+            if cached is not None:
+                self.cache.record_hit(url)
+                return cached
+            # Validator without a stored body, fetch the full resource again
+            response = fetch(url, params=params, headers=headers, **kwargs)
+        
+        self.cache.record_miss(url)
+        if response.status_code == 200:
+            self.cache.store(key, url, response)
+        return response
+    
+    def get_limited(self, url: str, max_bytes: int, **kwargs: Any) -> Any:
+        """
+        Stream a GET and stop reading the body once ``max_bytes`` are received.
+        
+        The returned response holds at most ``max_bytes`` of content and two
+        extra attributes: ``truncated`` and ``bytes_saved`` (bytes of the
+        announced Content-Length that were never transferred).
+        
+        Args:
+            url: Request URL
+            max_bytes: Byte budget for the body
+            
+        Returns:
+            Response with a possibly truncated body
+        """
+        return self.get(url, stream=True, max_bytes=max_bytes, **kwargs)
+    
+    def post(self, url: str, **kwargs: Any) -> Any:
+        """Send a POST request."""
+        return self.request("POST", url, **kwargs)
+
+    def recorded_call(self, name: str, payload: Dict[str, Any], fn: Callable[[], Any]) -> Any:
+        """Run a call made outside this client (SDKs) through record / replay when enabled."""
+        if self.replay is None:
+            return fn()
+        return self.replay.call(name, payload, fn)
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        self.session.close()
+        if self._http2_client is not None:
+            self._http2_client.close()
+
+
+_http_client: Optional[HttpClient] = None
+_http_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """Return the process-wide shared HTTP client."""
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            replay = HttpReplay() if settings.http_replay_mode != "off" else None
+            # Replayed runs must not depend on what a previous run left in the cache
+            cache = HttpCache() if settings.http_cache_enabled and not (replay and replay.replaying) else None
+            _http_client = HttpClient(cache=cache, replay=replay)
+        return _http_client
@@ -0,0 +1,287 @@
+"""Record / replay of outbound HTTP calls for offline runs and benchmarks."""
+import base64
+import hashlib
+import io
+import json
+import re
+import threading
+import time
+from datetime import date
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from .config import settings
+from .logger import logger, log_step
+
+
+def read_limited(response: Any, max_bytes: int) -> Any:
+    """
+    Read a streamed body and stop once ``max_bytes`` are received.
+
+    Sets ``truncated`` and ``bytes_saved`` (bytes of the announced
+    Content-Length that were never transferred) on the response, whose
+    content then holds at most ``max_bytes``.
+
+    Args:
+        response: Streamed ``requests`` response
+        max_bytes: Byte budget for the body
+
+    Returns:
+        The same response
+    """
+    response.truncated = False
+    response.bytes_saved = 0
+    if response.status_code != 200:
+        response.content  # Small error or 304 body, read it whole
+        return response
+
+    chunks = []
+    received = 0
+    try:
+        for chunk in response.iter_content(chunk_size=min(8192, max_bytes)):
+            chunks.append(chunk)
+            received += len(chunk)
+            if received >= max_bytes:
+                response.truncated = True
+                break
+
+        if response.truncated:
+            content_length = response.headers.get("Content-Length")
+            if content_length and content_length.isdigit():
+                # Bytes read from the wire (compressed size when gzip is used)
+                response.bytes_saved = max(0, int(content_length) - response.raw.tell())
+    finally:
+        response.close()
+
+    response._content = b"".join(chunks)[:max_bytes]
+    response._content_consumed = True
+    return response
+
+
+class HttpReplay:
+    """Fixture store sitting under ``HttpClient``.
+
+    In ``record`` mode every response is saved to one JSON fixture per
+    request (method, URL without secrets, query, JSON body, Accept header and
+    byte budget make the key; dates computed from now can be keyed relative
+    to today). In ``replay`` mode responses are served from the fixtures
+    without touching the network, optionally after an injected delay; a
+    request without fixture fails like an unreachable host.
+    """
+
+    RECORD = "record"
+    REPLAY = "replay"
+
+    # Query parameters holding credentials, never written to fixtures
+    SECRET_PARAMS = ("key", "api_key", "apikey", "access_token", "token")
+
+    # Headers describing the wire encoding of a body that is stored decoded
+    DROPPED_HEADERS = ("Content-Encoding", "Transfer-Encoding", "Content-Length", "Set-Cookie")
+
+    # Calendar dates in query values (e.g. the crawl's ``created:>YYYY-MM-DD``)
+    DATE_PATTERN = re.compile(r"\b(\d{4})-(\d{2})-(\d{2})\b")
+
+    def __init__(
+        self,
+        mode: Optional[str] = None,
+        fixtures_dir: Optional[str] = None,
+        latency: Optional[float] = None,
+        recorded_latency: Optional[bool] = None
+    ):
+        self.mode = mode or settings.http_replay_mode
+        if self.mode not in (self.RECORD, self.REPLAY):
+            raise ValueError(f"Unknown HTTP replay mode: {self.mode}")
+        self.fixtures_dir = Path(fixtures_dir or settings.http_replay_dir)
+        self.fixtures_dir.mkdir(parents=True, exist_ok=True)
+        self.latency = settings.http_replay_latency if latency is None else latency
+        self.recorded_latency = settings.http_replay_recorded_latency if recorded_latency is None else recorded_latency
+        self.served = 0
+        self.missing = 0
+        self._lock = threading.Lock()
+
+        logger.info(
+            "HTTP replay enabled",
+            **log_step("http_replay_ready", mode=self.mode, fixtures_dir=str(self.fixtures_dir),
+                       latency=self.latency, recorded_latency=self.recorded_latency)
+        )
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == self.REPLAY
+
+    @classmethod
+    def _strip_secrets(cls, url: str) -> str:
+        parts = urlsplit(url)
+        query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k.lower() not in cls.SECRET_PARAMS]
+        return urlunsplit(parts._replace(query=urlencode(query)))
+
+    @classmethod
+    def _relative_dates(cls, value: Any) -> Any:
+        """Replace dates in a query value by their offset from today, so keys survive a day change."""
+        if not isinstance(value, str):
+            return value
+
+        def offset(match: "re.Match[str]") -> str:
+            try:
+                day = date(*(int(part) for part in match.groups()))
+            except ValueError:
+                return match.group(0)
+            return f"<today-{(date.today() - day).days}d>"
+
+        return cls.DATE_PATTERN.sub(offset, value)
+
+    def make_key(
+        self,
+        method: str,
+        url: str,
+        max_bytes: Optional[int] = None,
+        relative_dates: bool = False,
+        **kwargs: Any
+    ) -> str:
+        """
+        Fixture key of a request (credentials and conditional headers are ignored).
+
+        With ``relative_dates`` the dates in query values are keyed as an offset
+        from today; set it for dates computed from now, not for literal ones.
+        """
+        headers = CaseInsensitiveDict(kwargs.get("headers") or {})
+        params = kwargs.get("params") or {}
+        if relative_dates:
+            params = {k: self._relative_dates(v) for k, v in params.items()}
+        request = {
+            "method": method.upper(),
+            "url": self._strip_secrets(url),
+            "params": params,
+            "json": kwargs.get("json"),
+            "data": kwargs.get("data"),
+            "accept": headers.get("Accept", "")
+        }
+        if max_bytes:
+            request["max_bytes"] = max_bytes
+        raw = json.dumps(request, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _fixture_path(self, key: str) -> Path:
+        return self.fixtures_dir / f"{key}.json"
+
+    def _write(self, key: str, fixture: Dict[str, Any]) -> None:
+        try:
+            with open(self._fixture_path(key), 'w', encoding='utf-8') as f:
+                json.dump(fixture, f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            logger.warning("Failed to write HTTP fixture", **log_step("http_replay_write_error", error=str(e)))
+
+    def _read(self, key: str, description: str) -> Dict[str, Any]:
+        path = self._fixture_path(key)
+        if not path.exists():
+            with self._lock:
+                self.missing += 1
+            logger.warning("No HTTP fixture for request", **log_step("http_replay_missing", request=description))
+            raise requests.ConnectionError(f"No recorded fixture for {description}")
+        with open(path, 'r', encoding='utf-8') as f:
+            fixture = json.load(f)
+        delay = self.latency + (fixture.get("elapsed", 0.0) if self.recorded_latency else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+        with self._lock:
+            self.served += 1
+        return fixture
+
+    @staticmethod
+    def _build_response(fixture: Dict[str, Any]) -> requests.Response:
+        """Rebuild a response whose body can be read whole or streamed."""
+        if fixture.get("body_encoding") == "base64":
+            body = base64.b64decode(fixture["body"])
+        else:
+            body = fixture["body"].encode("utf-8")
+        response = requests.Response()
+        response.status_code = fixture["status"]
+        response.headers = CaseInsensitiveDict(fixture.get("headers", {}))
+        response.headers["Content-Length"] = str(len(body))
+        response.raw = io.BytesIO(body)
+        response.url = fixture.get("url", "")
+        response.encoding = fixture.get("encoding")
+        if "truncated" in fixture:
+            response.truncated = fixture["truncated"]
+            response.bytes_saved = fixture.get("bytes_saved", 0)
+        return response
+
+    def save(
+        self,
+        method: str,
+        url: str,
+        response: Any,
+        elapsed: float,
+        max_bytes: Optional[int] = None,
+        **kwargs: Any
+    ) -> requests.Response:
+        """
+        Record a live response and return an equivalent replayable response.
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            response: ``requests`` or ``httpx`` response
+            elapsed: Time taken by the live call, replayed when recorded latency is on
+            max_bytes: Byte budget of a ``get_limited`` call; the body is streamed
+                and cut there, and ``truncated`` / ``bytes_saved`` are recorded
+
+        Returns:
+            Response rebuilt from the fixture, so record and replay runs behave alike
+        """
+        limited = {}
+        if max_bytes:
+            read_limited(response, max_bytes)
+            limited = {"truncated": response.truncated, "bytes_saved": response.bytes_saved}
+        body = response.content
+        try:
+            text, body_encoding = body.decode("utf-8"), "utf-8"
+        except UnicodeDecodeError:
+            text, body_encoding = base64.b64encode(body).decode("ascii"), "base64"
+        fixture = {
+            "method": method.upper(),
+            "url": self._strip_secrets(str(response.url or url)),
+            "params": kwargs.get("params") or {},
+            "status": response.status_code,
+            "headers": {k: v for k, v in response.headers.items() if k.title() not in self.DROPPED_HEADERS},
+            "encoding": response.encoding,
+            "elapsed": round(elapsed, 3),
+            "body_encoding": body_encoding,
+            "body": text,
+            **limited
+        }
+        self._write(self.make_key(method, url, max_bytes=max_bytes, **kwargs), fixture)
+        return self._build_response(fixture)
+
+    def load(self, method: str, url: str, max_bytes: Optional[int] = None, **kwargs: Any) -> requests.Response:
+        """Serve a recorded response, raising ``requests.ConnectionError`` when none exists."""
+        key = self.make_key(method, url, max_bytes=max_bytes, **kwargs)
+        return self._build_response(self._read(key, f"{method.upper()} {self._strip_secrets(url)}"))
+
+    def call(self, name: str, payload: Dict[str, Any], fn: Callable[[], Any]) -> Any:
+        """
+        Record or replay a non-HTTP-client call (e.g. an SDK) returning JSON data.
+
+        Args:
+            name: Call family, part of the fixture key
+            payload: Arguments identifying the call
+            fn: Live call, only run in record mode
+
+        Returns:
+            Live or recorded result
+        """
+        key = self.make_key("CALL", name, json=payload)
+        if self.replaying:
+            return self._read(key, name)["result"]
+        started = time.time()
+        result = fn()
+        self._write(key, {"call": name, "payload": payload, "elapsed": round(time.time() - started, 3), "result": result})
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Fixture usage counters."""
+        return {"mode": self.mode, "served": self.served, "missing": self.missing}
@@ -0,0 +1,155 @@
+"""GitHub rate-limit budget tracking and request pacing."""
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+from .config import settings
+from .logger import logger, log_step
+from .storage import atomic_write_json
+
+
+GITHUB_API_HOST = "api.github.com"
+
+
+class RateBudget:
+    """Rate-limit budget per GitHub resource (core, search, graphql...).
+
+    Budgets are read from the ``X-RateLimit-*`` headers of every GitHub
+    response and persisted so the next scheduler run starts with them.
+    """
+
+    # Longest wait before a GitHub budget is replenished (plus margin)
+    MAX_RESET_SECONDS = 2 * 3600
+
+    def __init__(self, state_file: Optional[str] = None, low_watermark: Optional[int] = None):
+        self.state_file = Path(state_file) if state_file else Path(settings.data_dir) / "github_rate_budget.json"
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        self.low_watermark = settings.github_rate_low_watermark if low_watermark is None else low_watermark
+        self.budgets: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        """Load persisted budgets."""
+        try:
+            if self.state_file.exists():
+                with open(self.state_file, 'r', encoding='utf-8') as f:
+                    self.budgets = json.load(f)
+                # GitHub budgets reset within the hour; a later reset was recorded from another API
+                self.budgets = {
+                    resource: budget for resource, budget in self.budgets.items()
+                    if budget.get('reset', 0) <= time.time() + self.MAX_RESET_SECONDS
+                }
+        except Exception as e:
+            logger.warning(
+                "Failed to load GitHub rate budget",
+                **log_step("rate_budget_load_error", error=str(e))
+            )
+            self.budgets = {}
+
+    def _save(self) -> None:
+        """Persist budgets."""
+        try:
+            atomic_write_json(self.state_file, self.budgets, indent=2)
+        except Exception as e:
+            logger.warning(
+                "Failed to save GitHub rate budget",
+                **log_step("rate_budget_save_error", error=str(e))
+            )
+
+    def record(self, response: Any) -> None:
+        """Record rate-limit headers from a response (non-GitHub responses are ignored)."""
+        # The HTTP client is shared with the AI providers, whose rate-limit headers
+        # use the same names with other meanings (reset in milliseconds...)
+        if urlparse(str(getattr(response, 'url', '') or '')).hostname != GITHUB_API_HOST:
+            return
+        headers = response.headers
+        remaining = headers.get('X-RateLimit-Remaining')
+        if remaining is None:
+            return
+        resource = headers.get('X-RateLimit-Resource', 'core')
+        try:
+            budget = {
+                'limit': int(headers.get('X-RateLimit-Limit', 0)),
+                'remaining': int(remaining),
+                'reset': int(headers.get('X-RateLimit-Reset', 0))
+            }
+        except ValueError:
+            return
+
+        with self._lock:
+            self.budgets[resource] = budget
+            self._save()
+
+        if self.is_low(resource):
+            logger.warning(
+                "GitHub rate budget nearly exhausted",
+                **log_step("rate_budget_low", resource=resource, **budget)
+            )
+
+    def remaining(self, resource: str = 'core') -> Optional[int]:
+        """Remaining calls for a resource, or None when unknown or already reset."""
+        budget = self.budgets.get(resource)
+        if not budget or budget.get('reset', 0) <= time.time():
+            return None
+        return budget.get('remaining')
+
+    def seconds_until_reset(self, resource: str = 'core') -> float:
+        """Seconds before the budget of a resource is replenished."""
+        budget = self.budgets.get(resource)
+        if not budget:
+            return 0.0
+        return max(0.0, budget.get('reset', 0) - time.time())
+
+    def is_low(self, resource: str = 'core') -> bool:
+        """True when the budget of a resource is at or below the low watermark."""
+        remaining = self.remaining(resource)
+        return remaining is not None and remaining <= self.low_watermark
+
+    def is_exhausted(self, resource: str = 'core') -> bool:
+        """True when no call is left for a resource until reset."""
+        return self.remaining(resource) == 0
+
+    def pace(self, resource: str = 'core') -> float:
+        """
+        Space out calls when the budget is low.
+
+        The remaining calls are spread over the time left before reset,
+        capped by ``settings.github_pace_max_delay``.
+
+        Returns:
+            Seconds slept
+        """
+        if not self.is_low(resource) or self.is_exhausted(resource):
+            return 0.0
+        delay = min(
+            self.seconds_until_reset(resource) / max(self.remaining(resource) or 1, 1),
+            settings.github_pace_max_delay
+        )
+        if delay > 0:
+            logger.info(
+                "Pacing GitHub request",
+                **log_step("rate_budget_pace", resource=resource, delay=round(delay, 2))
+            )
+            time.sleep(delay)
+        return delay
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Remaining budget per resource."""
+        return {resource: self.remaining(resource) for resource in self.budgets}
+
+
+_rate_budget: Optional[RateBudget] = None
+_rate_budget_lock = threading.Lock()
+
+
+def get_rate_budget() -> RateBudget:
+    """Return the process-wide GitHub rate budget."""
+    global _rate_budget
+    with _rate_budget_lock:
+        if _rate_budget is None:
+            _rate_budget = RateBudget()
+        return _rate_budget
@@ -0,0 +1,155 @@
+"""Crash-safe and multi-process-safe file writes for the JSON state files."""
+import json
+import os
+import stat
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator, List, Tuple, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+PathLike = Union[str, Path]
+
+# Process umask, read once (os.umask can only be read by setting it)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _fsync_dir(directory: Path) -> None:
+    """Persist a rename in its directory (not supported on Windows)."""
+    if os.name == "nt":
+        return
+    fd = os.open(str(directory), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write_text(path: PathLike, text: str) -> None:
+    """
+    Replace a file so that readers see either the old or the new content.
+
+    The text goes to a temporary file in the same directory, is fsynced,
+    then renamed over the target; a crash or Ctrl+C mid-write leaves the
+    previous file untouched. The target keeps its permissions (new files
+    get the usual umask-based ones, not the 0600 of temporary files).
+
+    Args:
+        path: Target file
+        text: New content
+    """
+    path = Path(path)
+    fd, tmp_name = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            mode = 0o666 & ~_UMASK
+        os.chmod(tmp_name, mode)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+    _fsync_dir(path.parent)
+
+
+def atomic_write_json(path: PathLike, data: Any, **dump_kwargs: Any) -> None:
+    """Serialize ``data`` as JSON and write it with ``atomic_write_text``."""
+    atomic_write_text(path, json.dumps(data, **dump_kwargs))
+
+
+@contextmanager
+def file_lock(path: PathLike, timeout: float = 30.0) -> Iterator[None]:
+    """
+    Hold an exclusive advisory lock on ``<path>.lock`` (fcntl or msvcrt).
+
+    Args:
+        path: File protected by the lock
+        timeout: Seconds to wait for another process to release it
+
+    Raises:
+        TimeoutError: When the lock is still held after ``timeout``
+    """
+    lock_path = Path(f"{path}.lock")
+    with open(lock_path, 'a+') as lock_file:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+                break
+            except OSError:
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"Could not lock {path} within {timeout}s")
+                time.sleep(0.05)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def append_journal(path: PathLike, record: Any) -> None:
+    """Append one JSON record as a line and fsync it (call with the file lock held)."""
+    line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+    with open(path, 'ab+') as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell():
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                line = b"\n" + line  # Close a line torn by a crash
+        f.write(line)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def read_journal(path: PathLike, offset: int = 0) -> Tuple[List[Any], int]:
+    """
+    Read the complete journal records written after ``offset``.
+
+    A last line without its newline (crash during an append) is ignored;
+    the next append terminates it so it is skipped as invalid JSON.
+
+    Args:
+        path: Journal file
+        offset: Byte offset to read from
+
+    Returns:
+        (records, offset after the last complete record)
+    """
+    path = Path(path)
+    if not path.exists():
+        return [], 0
+    records = []
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            offset += len(line)
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    return records, offset
@@ -0,0 +1,59 @@
+"""Posting analytics report from the precomputed history aggregates.
+
+Usage:
+    python -m src.history_report [--days 30] [--json]
+"""
+import argparse
+import json
+
+from .services.history_stats import HistoryStats
+
+
+def _format_seconds(seconds):
+    if seconds is None:
+        return "n/a"
+    if seconds >= 3600:
+        return f"{seconds / 3600:.1f} h"
+    if seconds >= 60:
+        return f"{seconds / 60:.1f} min"
+    return f"{seconds:.1f} s"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Posting analytics report")
+    parser.add_argument("--days", type=int, default=30, help="Days shown in the posts-per-day table")
+    parser.add_argument("--json", action="store_true", help="Print the raw aggregates as JSON")
+    args = parser.parse_args()
+
+    stats = HistoryStats()
+    if not stats.exists():
+        # First report on an existing history: build the aggregates once
+        from .services.history_service import HistoryService
+        stats = HistoryService().stats
+
+    if args.json:
+        print(json.dumps(stats.summary(args.days), indent=2, ensure_ascii=False))
+        return
+
+    print(f"📊 Posts recorded: {stats.total()}")
+
+    print(f"\n📅 Posts per day (last {args.days} days)")
+    for day, count in stats.posts_per_day(args.days).items():
+        print(f"  {day}  {count:>3}  {'█' * count}")
+
+    for dimension, title in (("language", "🧑‍💻 Language"), ("source", "🔎 Source"), ("channel", "📤 Channel")):
+        counts = stats.counts(dimension)
+        print(f"\n{title}")
+        for value, share in stats.share(dimension).items():
+            print(f"  {value:<20} {counts[value]:>5}  {share:6.1%}")
+
+    print(f"\n⏱️ Median time from fetch to post: {_format_seconds(stats.median_fetch_to_post())}")
+    averages = stats.average_stage_durations()
+    if averages:
+        print("⏱️ Average stage durations:")
+        for stage, seconds in averages.items():
+            print(f"  {stage:<12} {_format_seconds(seconds)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,61 +1,134 @@
 """Complete GitHub Tweet Bot workflow with enhanced Firefox fallback."""
 import asyncio
 import time
-import random
 from pathlib import Path
 
 from .core.config import settings
 from .core.logger import logger, log_step
+from .core.http_client import get_http_client
 from .services.github_service import GitHubService
 from .services.screenshot_service import ScreenshotService
 from .services.ai_service import AIService
 from .services.twitter_service import TwitterService
+from .services.tweet_validator import TweetValidator
 from .services.history_service import HistoryService
+from .services.candidate_pool_service import CandidatePoolService
+from .services.star_history_service import StarHistoryService
+from .services.repo_identity import canonical_repo_key
+
+
+def _fetch_trending(github_service, star_history):
+    """Fetch trending repositories from the healthiest sources and snapshot their stars."""
+    repositories = github_service.get_trending_repositories_with_fallbacks(limit=20)
+    # Every fetched repository, posted or not, keeps the star series regular
+    star_history.record(repositories)
+    return repositories
+
+
+def _refill_candidate_pool(candidate_pool, github_service, star_history, history_service, unposted_repos, enriched_keys):
+    """
+    Enrich unposted repositories in one round trip and pool the active ones, fastest growing first.
+
+    ``enriched_keys`` holds the repositories already enriched during this run
+    (enriched in place), which are pooled without a second GraphQL query.
+    """
+    pending = [repo for repo in unposted_repos
+               if canonical_repo_key(repo.get('full_name') or repo.get('html_url')) not in enriched_keys]
+    # Repositories fetched without a total star count were not snapshotted yet
+    untracked = [repo for repo in pending if not star_history.has_total_stars(repo)]
+    github_service.enrich_repositories(pending)
+    enriched_keys.update(canonical_repo_key(repo.get('full_name') or repo.get('html_url')) for repo in pending)
+    star_history.record(untracked)
+    # Enrichment resolves repository IDs and renames: filter again against the history
+    enriched = history_service.get_unposted_repos(unposted_repos)
+    fetched_at = int(time.time())
+    for repo in enriched:
+        repo.setdefault('fetched_at', fetched_at)  # For the fetch-to-post analytics
+    candidate_pool.refill(star_history.rank([repo for repo in enriched if not repo.get('archived')]))
+
+
+def _validate_tweets(
+    tweet_validator, ai_service, main_tweet, reply_tweet, repo_name, repo_url, content=None, generated=None
+):
+    """Validate tweets with the local rules, asking the LLM only when they are inconclusive."""
+    validation = tweet_validator.validate(main_tweet, reply_tweet, repo_url, generated)
+    if content and not content.valid:
+        # The combined generation flagged its own content: correct it whatever the rules say
+        issues = validation['issues'] + [content.issue or "contenu signalé par l'auto-vérification"]
+        return {'is_valid': False, 'message': f"ERREUR: {'; '.join(issues)}", 'provider': content.provider}
+    if validation['conclusive']:
+        return validation
+    if content:
+        # Already self-checked by the combined generation
+        return {'is_valid': True, 'message': 'Auto-vérifié à la génération', 'provider': content.provider}
+    return ai_service.validate_tweet_content(main_tweet, reply_tweet, repo_name)
 
 
 async def process_trending_repository():
     """Complete workflow for processing a trending repository."""
     start_time = time.time()
     
+    # Stage durations, kept with the history entry for analytics
+    stages = {}
+    stage_started = start_time
+    
+    def end_stage(name):
+        nonlocal stage_started
+        now = time.time()
+        stages[name] = round(now - stage_started, 3)
+        stage_started = now
+    
     logger.info("Starting complete workflow", **log_step("workflow_start"))
     
-    # Initialize services
-    github_service = GitHubService()
-    ai_service = AIService()
+    # Initialize services (outbound HTTP calls share one pooled client)
+    http_client = get_http_client()
+    github_service = GitHubService(http_client)
+    ai_service = AIService(http_client)
+    ai_service.start_ollama_warmup()  # Loads the local model while GitHub is queried
     twitter_service = TwitterService()
+    tweet_validator = TweetValidator()
     history_service = HistoryService()
     
     try:
-        # Step 1: Get trending repositories with fallbacks
+        # Step 1: Take the next candidate from the persistent pool, refilling it
+        # from the trending sources only when it runs low
         logger.info("Step 1: Fetching trending repositories with fallbacks", **log_step("step_1_start"))
-        repositories = github_service.get_trending_repositories_with_fallbacks(limit=20)
+        candidate_pool = CandidatePoolService()
+        star_history = StarHistoryService()
+        repositories = None
+        enriched_keys = set()
         
-        if not repositories:
-            logger.error("No repositories found from all sources", **log_step("workflow_error"))
-            return
+        if candidate_pool.needs_refill():
+            repositories = _fetch_trending(github_service, star_history)
+            if not repositories and not candidate_pool.size():
+                logger.error("No repositories found from all sources", **log_step("workflow_error"))
+                return
+            _refill_candidate_pool(candidate_pool, github_service, star_history, history_service,
+                                   history_service.get_unposted_repos(repositories), enriched_keys)
         
-        # Filter out already posted repositories
-        unposted_repos = history_service.get_unposted_repos(repositories)
+        repo = candidate_pool.peek(history_service)
         
-        if not unposted_repos:
-            logger.warning("All trending repositories already posted", **log_step("all_posted"))
-            # Clear old history and try again
-            history_service.clear_old_history(days=7)
+        if repo is None:
+            if repositories is None:
+                repositories = _fetch_trending(github_service, star_history)
             unposted_repos = history_service.get_unposted_repos(repositories)
             
+            if not unposted_repos:
+                logger.warning("All trending repositories already posted", **log_step("all_posted"))
+                # Clear old history and try again
+                history_service.clear_old_history(days=7)
+                unposted_repos = history_service.get_unposted_repos(repositories)
+            
             if not unposted_repos:
                 logger.warning("Still no new repositories after clearing history, trying next fallback methods")
-                # Essayer explicitement chaque méthode de fallback
-                fallback_methods = [
-                    ("GitHub scraping", github_service.scrape_github_trending_fallback),
-                    ("OSS Insight API", github_service.fetch_ossinsight_trending),
-                    ("Gitstar Ranking", github_service.fetch_gitstar_ranking)
-                ]
+                # Essayer explicitement chaque méthode de fallback (sources saines d'abord)
+                fallback_methods = github_service.fallback_sources()
                 
                 for method_name, method in fallback_methods:
                     logger.info(f"Trying fallback method: {method_name}", **log_step("fallback_attempt", method=method_name))
                     try:
                         fallback_repos = method(limit=20)
+                        star_history.record(fallback_repos)
                         if fallback_repos:
                             unposted_repos = history_service.get_unposted_repos(fallback_repos)
                             if unposted_repos:
@@ -67,13 +140,16 @@ async def process_trending_repository():
                             logger.warning(f"Fallback method {method_name} returned no repositories")
                     except Exception as e:
                         logger.error(f"Error with fallback method {method_name}: {str(e)}")
-                
-                if not unposted_repos:
-                    logger.error("No new repositories to post from any source", **log_step("workflow_error"))
-                    return
+            
+            if unposted_repos:
+                _refill_candidate_pool(candidate_pool, github_service, star_history, history_service,
+                                       unposted_repos, enriched_keys)
+                repo = candidate_pool.peek(history_service)
+            
+            if repo is None:
+                logger.error("No new repositories to post from any source", **log_step("workflow_error"))
+                return
         
-        # Select random unposted repository
-        repo = random.choice(unposted_repos)
         repo_name = repo['name'] if 'name' in repo else repo['full_name']
         repo_url = repo['html_url']
         
@@ -81,6 +157,7 @@ async def process_trending_repository():
             "Repository selected",
             **log_step("step_1_success", repo_name=repo_name, repo_url=repo_url)
         )
+        end_stage("select")
         
         # Step 2: Capture screenshot
         logger.info("Step 2: Capturing screenshot", **log_step("step_2_start"))
@@ -101,14 +178,23 @@ async def process_trending_repository():
                     **log_step("step_2_warning", error=str(e))
                 )
                 screenshot_path = None
+        end_stage("screenshot")
         
         # Step 3: Get README and generate content with AI
         logger.info("Step 3: Processing README with AI", **log_step("step_3_start"))
         
         readme_content = github_service.get_readme_content(repo_url)
         
-        if readme_content:
-            summary = ai_service.summarize_readme(readme_content)
+        # One call for summary, features and self-check; separate calls only if it fails
+        content = None
+        if readme_content and settings.ai_combined_generation:
+            content = ai_service.generate_repo_content(readme_content, repo_name)
+        
+        if content:
+            summary = content.summary
+            features = content.features
+        elif readme_content:
+            summary = ai_service.summarize_readme(readme_content, repo_name)
             features = ai_service.extract_key_features(readme_content)
         else:
             summary = "Découvrez ce projet GitHub intéressant !"
@@ -116,8 +202,10 @@ async def process_trending_repository():
         
         logger.info(
             "AI processing completed",
-            **log_step("step_3_success", summary_length=len(summary), features_count=len(features))
+            **log_step("step_3_success", summary_length=len(summary), features_count=len(features),
+                       readme_bytes_saved=github_service.readme_bytes_saved)
         )
+        end_stage("ai")
         
         # Step 4: Create and post tweets
         logger.info("Step 4: Creating and posting tweets", **log_step("step_4_start"))
@@ -126,9 +214,12 @@ async def process_trending_repository():
         main_tweet_text = twitter_service.create_viral_tweet_text(repo, summary)
         reply_text = twitter_service.create_reply_text(repo, features, repo_url)
         
-        # Step 4.5: Validate tweet content with AI
+        # Step 4.5: Validate tweet content (local rules first, AI only when they are inconclusive)
         logger.info("🤖 Validating tweet content...", **log_step("tweet_validation_start"))
-        validation = ai_service.validate_tweet_content(main_tweet_text, reply_text, repo_name)
+        validation = _validate_tweets(
+            tweet_validator, ai_service, main_tweet_text, reply_text, repo_name, repo_url, content,
+            generated=[summary, *features]
+        )
         
         if not validation['is_valid']:
             logger.warning(
@@ -151,7 +242,9 @@ async def process_trending_repository():
                 
                 # Re-validate corrected tweets
                 logger.info("🔄 Re-validating corrected tweets...", **log_step("tweet_revalidation_start"))
-                revalidation = ai_service.validate_tweet_content(main_tweet_text, reply_text, repo_name)
+                revalidation = _validate_tweets(
+                    tweet_validator, ai_service, main_tweet_text, reply_text, repo_name, repo_url
+                )
                 
                 if revalidation['is_valid']:
                     logger.info(
@@ -181,6 +274,7 @@ async def process_trending_repository():
                       reply_length=len(reply_text),
                       validation_status=validation['is_valid'])
         )
+        end_stage("validation")
         
         # POST MAIN TWEET WITH ENHANCED FALLBACK
         logger.info("Posting main tweet with automatic fallback", **log_step("main_tweet_post_start"))
@@ -199,8 +293,18 @@ async def process_trending_repository():
             **log_step("main_tweet_success", tweet_id=main_tweet_id)
         )
         
-        # Mark repository as posted
-        history_service.mark_as_posted(repo_url, main_tweet_id)
+        end_stage("post")
+        
+        # Mark repository as posted, with analytics metadata
+        history_service.mark_as_posted(repo_url, main_tweet_id, {
+            'language': repo.get('language') or None,
+            'source': repo.get('source'),
+            'channel': twitter_service.last_post_channel,
+            'fetch_to_post': round(time.time() - repo['fetched_at'], 1) if repo.get('fetched_at') else None,
+            'stages': stages
+        })
+        # Only a posted candidate leaves the pool, a failed run retries it next time
+        candidate_pool.remove(repo)
         
         # POST REPLY WITH ENHANCED FALLBACK
         logger.info("Posting reply with automatic fallback", **log_step("reply_tweet_post_start"))
@@ -239,6 +343,9 @@ async def process_trending_repository():
         )
         raise
     finally:
+        # Save the READMEs distilled during this run in one write
+        ai_service.distiller.flush()
+        
         # Clean up Firefox service if initialized
         try:
             twitter_service.close_firefox()
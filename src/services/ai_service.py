@@ -1,33 +1,92 @@
 """AI service with multi-provider fallback system."""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, List, Optional, Dict, Any
+
+import json
+import re
+
 import ollama
-import requests
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, Field, ValidationError, field_validator
 
 from ..core.config import settings
 from ..core.logger import logger, log_step
+from ..core.http_client import HttpClient, get_http_client
+from .llm_cache import LlmResponseCache
+from .provider_registry import ProviderQuotaError, ProviderRegistry
+from .readme_distiller import ReadmeDistiller
+from .tweet_validator import ACCENT_LEXICON, SUMMARY_MAX_LENGTH, WORD_RE
+
+
+# End of a sentence: punctuation, closing quotes, then whitespace
+SENTENCE_END_RE = re.compile(r'[.!?…]["»\')]*\s')
+
+
+class RepoContent(BaseModel):
+    """Summary, features and self-check returned by the combined generation."""
+    
+    summary: str = Field(min_length=10)
+    features: List[str] = Field(min_length=3)
+    valid: bool
+    issue: Optional[str] = None
+    provider: Optional[str] = None  # Set by AIService, not generated
+    
+    @field_validator('summary')
+    @classmethod
+    def _strip_summary(cls, value: str) -> str:
+        value = value.strip().strip('"')
+        # A longer summary would be truncated in the tweet and fail the local validation
+        if len(value) > SUMMARY_MAX_LENGTH:
+            raise ValueError(f"summary longer than {SUMMARY_MAX_LENGTH} characters")
+        return value
+    
+    @field_validator('features')
+    @classmethod
+    def _clean_features(cls, value: List[str]) -> List[str]:
+        features = [f for f in (f.strip().lstrip('-•* ').strip() for f in value if f) if f]
+        if len(features) < 3:
+            raise ValueError("three features expected")
+        return features[:3]
 
 
 class AIService:
     """AI service with multi-provider fallback system."""
     
-    def __init__(self):
+    GEMINI_MODEL = "gemini-1.5-flash"
+    OPENROUTER_MODEL = "mistralai/mistral-small-3.2-24b-instruct:free"
+    MISTRAL_MODEL = "mistral-small-latest"
+    
+    def __init__(self, http_client: Optional[HttpClient] = None):
+        self.http = http_client or get_http_client()
+        self.distiller = ReadmeDistiller()
         self.ollama_client = ollama.Client(host=settings.ollama_host)
         self.ollama_model = settings.ollama_model
         
-        # Provider order: Gemini -> OpenRouter -> Mistral -> Ollama
-        self.providers = [
-            ("Gemini", self._gemini_request),
-            ("OpenRouter", self._openrouter_request), 
-            ("Mistral", self._mistral_request),
-            ("Ollama", self._ollama_request)
-        ]
+        # Preference order: Gemini -> OpenRouter -> Mistral -> Ollama, reordered per task
+        # from the rolling statistics; providers without API key are dropped
+        self.registry = ProviderRegistry([
+            ("Gemini", self._gemini_request, bool(settings.gemini_api_key)),
+            ("OpenRouter", self._openrouter_request, bool(settings.openrouter_api_key)),
+            ("Mistral", self._mistral_request, bool(settings.mistral_api_key)),
+            ("Ollama", self._ollama_request, True)
+        ])
+        self.models = {
+            "Gemini": self.GEMINI_MODEL,
+            "OpenRouter": self.OPENROUTER_MODEL,
+            "Mistral": self.MISTRAL_MODEL,
+            "Ollama": self.ollama_model
+        }
+        self.cache = LlmResponseCache() if settings.llm_cache_enabled else None
+        self.last_result: Optional[Dict[str, Any]] = None
     
-    def summarize_readme(self, readme_content: str) -> str:
+    def summarize_readme(self, readme_content: str, repo_name: Optional[str] = None) -> str:
         """
         Generate a catchy French summary using multi-provider fallback.
         
         Args:
             readme_content: README content to summarize
+            repo_name: Repository name, left untouched by the accent fixes
             
         Returns:
             French summary or fallback text
@@ -42,19 +101,18 @@ Utilise les accents français. Sois enthousiaste et précis.
 
 Exemples: "Convertisseur intelligent qui transforme tous vos documents en Markdown", "Modèle d'IA révolutionnaire pour le raisonnement avancé"
 
-Projet: {readme_content[:800]}
+Projet: {self.distiller.distill(readme_content, max_chars=800)}
 
 Phrase accrocheuse:"""
         
-        # Try each provider in order
-        for provider_name, provider_func in self.providers:
-            summary = self._try_provider(provider_func, prompt, provider_name, "summary")
-            if summary:
-                logger.info(
-                    "Summary generated",
-                    **log_step("ai_summary_success", provider=provider_name, summary_length=len(summary))
-                )
-                return self._fix_accents(summary)
+        result = self._generate(prompt, "summary", shape="sentence")
+        if result:
+            logger.info(
+                "Summary generated",
+                **log_step("ai_summary_success", provider=result['provider'], summary_length=len(result['text']),
+                           latency=result['latency'], percentiles=result['percentiles'])
+            )
+            return self._fix_accents(result['text'], repo_name)
         
         # All providers failed
         logger.error("All AI providers failed for summary", **log_step("ai_summary_all_failed"))
@@ -84,26 +142,92 @@ Conversion automatique
 Interface intuitive
 Support multi-formats
 
-Projet: {readme_content[:600]}
+Projet: {self.distiller.distill(readme_content, max_chars=600)}
 
 Fonctionnalités:"""
         
-        # Try each provider in order
-        for provider_name, provider_func in self.providers:
-            features_text = self._try_provider(provider_func, prompt, provider_name, "features")
-            if features_text:
-                features = [f.strip() for f in features_text.split('\n') if f.strip() and not f.startswith('Voici')][:3]
-                if features:
-                    logger.info(
-                        "Features extracted",
-                        **log_step("ai_features_success", provider=provider_name, count=len(features))
-                    )
-                    return features
+        result = self._generate(
+            prompt, "features", accept=lambda text: bool(self._parse_features(text)), shape="lines:3"
+        )
+        if result:
+            features = self._parse_features(result['text'])
+            logger.info(
+                "Features extracted",
+                **log_step("ai_features_success", provider=result['provider'], count=len(features),
+                           latency=result['latency'], percentiles=result['percentiles'])
+            )
+            return features
         
         # All providers failed
         logger.error("All AI providers failed for features", **log_step("ai_features_all_failed"))
         return ["Fonctionnalité principale", "Interface moderne", "Open source"]
     
+    def generate_repo_content(self, readme_content: str, repo_name: str) -> Optional[RepoContent]:
+        """
+        Generate summary, features and a quality self-check in a single call.
+        
+        The README is sent once and the answer is a JSON object parsed into
+        ``RepoContent``; a provider whose answer does not parse is skipped.
+        
+        Args:
+            readme_content: README content
+            repo_name: Repository name
+            
+        Returns:
+            RepoContent, or None when no provider produced valid JSON (use the
+            multi-call path then)
+        """
+        prompt = f"""Projet GitHub "{repo_name}" :
+{self.distiller.distill(readme_content, max_chars=800)}
+
+Réponds UNIQUEMENT avec un objet JSON, en français avec les accents :
+{{"summary": "phrase accrocheuse de 8-12 mots (100 caractères maximum) décrivant le projet",
+ "features": ["fonctionnalité 1", "fonctionnalité 2", "fonctionnalité 3"],
+ "valid": true,
+ "issue": null}}
+
+- summary : enthousiaste et précis, ex. "Convertisseur intelligent qui transforme tous vos documents en Markdown"
+- features : 3 fonctionnalités principales de 2-3 mots chacune, ex. "Conversion automatique"
+- valid : relis ton texte ; false si le français, les accents ou la pertinence posent problème
+- issue : description courte du problème si valid est false, sinon null"""
+        
+        logger.info(
+            "Generating summary, features and self-check in one call",
+            **log_step("ai_combined", content_length=len(readme_content), prompt_length=len(prompt))
+        )
+        
+        result = self._generate(
+            prompt, "combined", accept=lambda text: self._parse_repo_content(text) is not None,
+            attempts=1, max_tokens=300, json_mode=True
+        )
+        if not result:
+            logger.warning(
+                "Combined generation failed, using separate calls",
+                **log_step("ai_combined_fallback")
+            )
+            return None
+        
+        content = self._parse_repo_content(result['text'])
+        content.summary = self._fix_accents(content.summary, repo_name)
+        content.provider = result['provider']
+        logger.info(
+            "Summary, features and self-check generated",
+            **log_step("ai_combined_success", provider=result['provider'], valid=content.valid,
+                       issue=content.issue, latency=result['latency'], percentiles=result['percentiles'])
+        )
+        return content
+    
+    @staticmethod
+    def _parse_repo_content(text: str) -> Optional[RepoContent]:
+        """Parse a JSON answer, tolerating code fences and text around the object."""
+        match = re.search(r'\{.*\}', text, re.DOTALL)
+        if not match:
+            return None
+        try:
+            return RepoContent.model_validate(json.loads(match.group(0)))
+        except (ValueError, ValidationError):
+            return None
+    
     def validate_tweet_content(self, main_tweet: str, reply_tweet: str, repo_name: str) -> Dict[str, Any]:
         """Validate tweet content quality using AI."""
         prompt = f"""Analyse ces 2 tweets sur le projet GitHub "{repo_name}" et vérifie :
@@ -124,29 +248,21 @@ Réponds SEULEMENT par :
 "VALIDE" si tout est correct
 "ERREUR: [description courte]" si problème détecté"""
         
-        # Try each provider for validation
-        for provider_name, provider_func in self.providers:
-            try:
-                result = provider_func(prompt)
-                if result and len(result.strip()) > 0:
-                    validation = result.strip().upper()
-                    
-                    logger.info(
-                        "Tweet validation completed",
-                        **log_step("tweet_validation", provider=provider_name, result=validation[:50])
-                    )
-                    
-                    return {
-                        'is_valid': validation.startswith('VALIDE'),
-                        'message': result.strip(),
-                        'provider': provider_name
-                    }
-            except Exception as e:
-                logger.warning(
-                    f"Validation failed with {provider_name}",
-                    **log_step("validation_error", provider=provider_name, error=str(e))
-                )
-                continue
+        # One attempt per provider: validation is best effort
+        result = self._generate(prompt, "validation", attempts=1)
+        if result:
+            validation = result['text'].upper()
+            
+            logger.info(
+                "Tweet validation completed",
+                **log_step("tweet_validation", provider=result['provider'], result=validation[:50])
+            )
+            
+            return {
+                'is_valid': validation.startswith('VALIDE'),
+                'message': result['text'],
+                'provider': result['provider']
+            }
         
         # If all providers fail, assume valid (don't block posting)
         logger.warning("All validation providers failed, assuming valid", **log_step("validation_fallback"))
@@ -178,34 +294,27 @@ TWEET_REPONSE:
 
 Garde la même structure, longueur et style. Corrige seulement les erreurs signalées."""
         
-        # Try each provider for correction
-        for provider_name, provider_func in self.providers:
-            try:
-                result = provider_func(prompt)
-                if result and 'TWEET_PRINCIPAL:' in result and 'TWEET_REPONSE:' in result:
-                    # Parse the corrected tweets
-                    parts = result.split('TWEET_REPONSE:')
-                    if len(parts) == 2:
-                        corrected_main = parts[0].replace('TWEET_PRINCIPAL:', '').strip()
-                        corrected_reply = parts[1].strip()
-                        
-                        logger.info(
-                            "Tweet correction completed",
-                            **log_step("tweet_correction", provider=provider_name)
-                        )
-                        
-                        return {
-                            'success': True,
-                            'main_tweet': corrected_main,
-                            'reply_tweet': corrected_reply,
-                            'provider': provider_name
-                        }
-            except Exception as e:
-                logger.warning(
-                    f"Correction failed with {provider_name}",
-                    **log_step("correction_error", provider=provider_name, error=str(e))
-                )
-                continue
+        def well_formed(text: str) -> bool:
+            return 'TWEET_PRINCIPAL:' in text and len(text.split('TWEET_REPONSE:')) == 2
+        
+        result = self._generate(prompt, "correction", accept=well_formed, attempts=1)
+        if result:
+            # Parse the corrected tweets
+            parts = result['text'].split('TWEET_REPONSE:')
+            corrected_main = parts[0].replace('TWEET_PRINCIPAL:', '').strip()
+            corrected_reply = parts[1].strip()
+            
+            logger.info(
+                "Tweet correction completed",
+                **log_step("tweet_correction", provider=result['provider'])
+            )
+            
+            return {
+                'success': True,
+                'main_tweet': corrected_main,
+                'reply_tweet': corrected_reply,
+                'provider': result['provider']
+            }
         
         # If all providers fail, return original
         logger.warning("All correction providers failed, keeping original", **log_step("correction_fallback"))
@@ -216,36 +325,216 @@ Garde la même structure, longueur et style. Corrige seulement les erreurs signa
             'provider': 'fallback'
         }
     
-    def _try_provider(self, provider_func, prompt: str, provider_name: str, task: str) -> Optional[str]:
-        """Try a provider with 3 retry attempts."""
-        for attempt in range(3):
+    @staticmethod
+    def _parse_features(text: str) -> List[str]:
+        return [f.strip() for f in text.split('\n') if f.strip() and not f.startswith('Voici')][:3]
+    
+    def _generate(
+        self,
+        prompt: str,
+        task: str,
+        accept: Optional[Callable[[str], bool]] = None,
+        attempts: int = 3,
+        **options: Any
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get the first acceptable answer from the providers.
+        
+        An acceptable cached answer to the same request (any provider, in
+        provider order) is returned without calling the providers.
+        
+        Providers are ordered for the task by the registry, each with the
+        retry budget its success rate earns (at most ``attempts``). In
+        ``sequential`` mode they are tried in order. In ``hedged`` mode the
+        next provider is started after ``ai_hedge_delay`` seconds without an
+        answer (or as soon as the running ones failed); the first acceptable
+        answer wins and the other calls are abandoned.
+        
+        Args:
+            prompt: Prompt sent to every provider
+            task: Task name used in log steps
+            accept: Predicate an answer must satisfy (non-empty by default)
+            attempts: Attempts for a reliable provider
+            **options: Provider options (max_tokens, json_mode, shape)
+            
+        Returns:
+            {'text', 'provider', 'latency', 'percentiles', 'cached'} or None when all providers failed
+        """
+        accept = accept or (lambda text: True)
+        cached = self._cached(prompt, task, accept, options)
+        if cached:
+            return cached
+        
+        if settings.ai_request_mode == "hedged":
+            result = self._generate_hedged(prompt, task, accept, attempts, options)
+        else:
+            result = None
+            for provider_name, provider_func in self.registry.order(task):
+                text = self._try_provider(
+                    provider_func, prompt, provider_name, task,
+                    self.registry.attempts(provider_name, task, attempts), options=options
+                )
+                if text and accept(text):
+                    result = self._result(text, provider_name)
+                    break
+        
+        if result and self.cache is not None:
+            self.cache.put(self._cache_key(prompt, result['provider'], options), result['text'])
+        return result
+    
+    def _cache_key(self, prompt: str, provider_name: str, options: Dict[str, Any]) -> str:
+        return LlmResponseCache.key(prompt, provider_name, self.models.get(provider_name, ""), options)
+    
+    def _cached(
+        self,
+        prompt: str,
+        task: str,
+        accept: Callable[[str], bool],
+        options: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """Acceptable cached answer from the first provider that has one."""
+        if self.cache is None:
+            return None
+        for provider_name, _ in self.registry.providers:
+            text = self.cache.get(self._cache_key(prompt, provider_name, options))
+            if text and accept(text):
+                self.cache.record_lookup(task, hit=True, provider=provider_name)
+                return self._result(text, provider_name, cached=True)
+        self.cache.record_lookup(task, hit=False)
+        return None
+    
+    def _generate_hedged(
+        self,
+        prompt: str,
+        task: str,
+        accept: Callable[[str], bool],
+        attempts: int,
+        options: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """Race providers, starting a backup after each hedge delay."""
+        cancel = threading.Event()
+        waiting = self.registry.order(task)
+        if not waiting:
+            return None
+        running = {}
+        executor = ThreadPoolExecutor(max_workers=len(waiting), thread_name_prefix="ai-hedge")
+        
+        def launch() -> None:
+            provider_name, provider_func = waiting.pop(0)
+            if running:
+                logger.info(
+                    f"Hedging {task} with {provider_name}",
+                    **log_step("ai_hedge_launch", task=task, provider=provider_name, running=list(running.values()))
+                )
+            future = executor.submit(
+                self._try_provider, provider_func, prompt, provider_name, task,
+                self.registry.attempts(provider_name, task, attempts), cancel, options
+            )
+            running[future] = provider_name
+        
+        failed = False
+        try:
+            while waiting or running:
+                # Start a provider right away when nothing useful is running
+                if waiting and (not running or failed or settings.ai_hedge_delay <= 0):
+                    failed = False
+                    launch()
+                    continue
+                
+                done, _ = wait(
+                    running, timeout=settings.ai_hedge_delay if waiting else None, return_when=FIRST_COMPLETED
+                )
+                if not done:
+                    launch()  # Hedge delay elapsed without an answer: start a backup provider
+                
+                for future in done:
+                    provider_name = running.pop(future)
+                    text = future.result()
+                    if text and accept(text):
+                        if running:
+                            logger.info(
+                                f"{provider_name} won the {task} race",
+                                **log_step("ai_hedge_win", task=task, provider=provider_name,
+                                           abandoned=list(running.values()))
+                            )
+                        return self._result(text, provider_name)
+                    failed = True
+            return None
+        finally:
+            # Stop retries of the losing providers; their in-flight calls end on their own timeouts
+            cancel.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _result(self, text: str, provider_name: str, cached: bool = False) -> Dict[str, Any]:
+        self.last_result = {
+            'text': text,
+            'provider': provider_name,
+            'latency': None if cached else self.registry.last_latencies.get(provider_name),
+            'percentiles': self.registry.latency_percentiles(),
+            'cached': cached
+        }
+        return self.last_result
+    
+    def latency_percentiles(self) -> Dict[str, Dict[str, float]]:
+        """p50 / p90 / p99 call latency (seconds) per provider over the rolling window."""
+        return self.registry.latency_percentiles()
+    
+    def _try_provider(
+        self,
+        provider_func,
+        prompt: str,
+        provider_name: str,
+        task: str,
+        attempts: int = 3,
+        cancel: Optional[threading.Event] = None,
+        options: Optional[Dict[str, Any]] = None
+    ) -> Optional[str]:
+        """Try a provider with retry attempts."""
+        for attempt in range(attempts):
+            if cancel is not None and cancel.is_set():
+                return None
+            started = time.time()
             try:
-                result = provider_func(prompt)
-                if result and len(result.strip()) > 0:
+                result = provider_func(prompt, **(options or {}))
+                ok = bool(result and len(result.strip()) > 0)
+                self.registry.record(provider_name, task, ok, time.time() - started)
+                if ok:
                     return result.strip()
+            except ProviderQuotaError as e:
+                # Retrying cannot help until the quota resets
+                self.registry.record(provider_name, task, False, time.time() - started)
+                self.registry.record_quota(provider_name, e.retry_after)
+                return None
             except Exception as e:
+                self.registry.record(provider_name, task, False, time.time() - started)
                 logger.warning(
                     f"{provider_name} {task} attempt {attempt+1} failed",
                     **log_step(f"ai_{task}_retry", provider=provider_name, error=str(e), attempt=attempt+1)
                 )
         
         logger.warning(
-            f"{provider_name} failed after 3 attempts",
+            f"{provider_name} failed after {attempts} attempts",
             **log_step(f"ai_{task}_provider_failed", provider=provider_name)
         )
         return None
     
-    def _gemini_request(self, prompt: str) -> str:
+    def _gemini_request(
+        self, prompt: str, max_tokens: int = 150, json_mode: bool = False, shape: Optional[str] = None
+    ) -> str:
         """Make request to Gemini API."""
         if not settings.gemini_api_key:
             raise Exception("Gemini API key not configured")
         
-        response = requests.post(
-            f"https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent?key={settings.gemini_api_key}",
+        response = self.http.post(
+            f"https://generativelanguage.googleapis.com/v1beta/models/{self.GEMINI_MODEL}:generateContent?key={settings.gemini_api_key}",
             headers={"Content-Type": "application/json"},
             json={
                 "contents": [{"parts": [{"text": prompt}]}],
-                "generationConfig": {"temperature": 0.5, "maxOutputTokens": 150}
+                "generationConfig": {
+                    "temperature": 0.5,
+                    "maxOutputTokens": max_tokens,
+                    **({"responseMimeType": "application/json"} if json_mode else {})
+                }
             },
             timeout=30
         )
@@ -253,25 +542,30 @@ Garde la même structure, longueur et style. Corrige seulement les erreurs signa
         if response.status_code == 200:
             result = response.json()
             return result['candidates'][0]['content']['parts'][0]['text']
+        elif response.status_code == 429:
+            raise ProviderQuotaError("Gemini API error: 429", self._retry_after(response))
         else:
             raise Exception(f"Gemini API error: {response.status_code}")
     
-    def _openrouter_request(self, prompt: str) -> str:
+    def _openrouter_request(
+        self, prompt: str, max_tokens: int = 150, json_mode: bool = False, shape: Optional[str] = None
+    ) -> str:
         """Make request to OpenRouter API."""
         if not settings.openrouter_api_key:
             raise Exception("OpenRouter API key not configured")
         
-        response = requests.post(
+        response = self.http.post(
             "https://openrouter.ai/api/v1/chat/completions",
             headers={
                 "Authorization": f"Bearer {settings.openrouter_api_key}",
                 "Content-Type": "application/json"
             },
             json={
-                "model": "mistralai/mistral-small-3.2-24b-instruct:free",
+                "model": self.OPENROUTER_MODEL,
                 "messages": [{"role": "user", "content": prompt}],
-                "max_tokens": 150,
-                "temperature": 0.5
+                "max_tokens": max_tokens,
+                "temperature": 0.5,
+                **({"response_format": {"type": "json_object"}} if json_mode else {})
             },
             timeout=30
         )
@@ -279,25 +573,30 @@ Garde la même structure, longueur et style. Corrige seulement les erreurs signa
         if response.status_code == 200:
             result = response.json()
             return result['choices'][0]['message']['content']
+        elif response.status_code == 429:
+            raise ProviderQuotaError("OpenRouter API error: 429", self._retry_after(response))
         else:
             raise Exception(f"OpenRouter API error: {response.status_code}")
     
-    def _mistral_request(self, prompt: str) -> str:
+    def _mistral_request(
+        self, prompt: str, max_tokens: int = 150, json_mode: bool = False, shape: Optional[str] = None
+    ) -> str:
         """Make request to Mistral API."""
         if not settings.mistral_api_key:
             raise Exception("Mistral API key not configured")
         
-        response = requests.post(
+        response = self.http.post(
             "https://api.mistral.ai/v1/chat/completions",
             headers={
                 "Authorization": f"Bearer {settings.mistral_api_key}",
                 "Content-Type": "application/json"
             },
             json={
-                "model": "mistral-small-latest",
+                "model": self.MISTRAL_MODEL,
                 "messages": [{"role": "user", "content": prompt}],
-                "max_tokens": 150,
-                "temperature": 0.5
+                "max_tokens": max_tokens,
+                "temperature": 0.5,
+                **({"response_format": {"type": "json_object"}} if json_mode else {})
             },
             timeout=30
         )
@@ -305,32 +604,174 @@ Garde la même structure, longueur et style. Corrige seulement les erreurs signa
         if response.status_code == 200:
             result = response.json()
             return result['choices'][0]['message']['content']
+        elif response.status_code == 429:
+            raise ProviderQuotaError("Mistral API error: 429", self._retry_after(response))
         else:
             raise Exception(f"Mistral API error: {response.status_code}")
     
-    def _ollama_request(self, prompt: str) -> str:
-        """Make request to Ollama (local fallback)."""
-        response = self.ollama_client.generate(
-            model=self.ollama_model,
-            prompt=prompt,
-            think=False,
-            options={"temperature": 0.5, "num_predict": 120}
-        )
-        return response['response']
+    @staticmethod
+    def _retry_after(response) -> Optional[float]:
+        """Seconds from a Retry-After header, when given as a number."""
+        try:
+            return float(response.headers.get('Retry-After'))
+        except (TypeError, ValueError):
+            return None
     
-    def _fix_accents(self, text: str) -> str:
-        """Fix common missing French accents."""
-        accent_fixes = {
-            'crez': 'créez', 'prsence': 'présence',
-            'revolutionnaire': 'révolutionnaire', 'avance': 'avancé',
-            'editeur': 'éditeur', 'fonctionnalites': 'fonctionnalités',
-            'donnees': 'données', 'cree': 'crée', 'integre': 'intègre',
-            'genere': 'génère', 'ameliore': 'améliore'
+    def _ollama_request(
+        self, prompt: str, max_tokens: int = 120, json_mode: bool = False, shape: Optional[str] = None
+    ) -> str:
+        """Make request to Ollama (local fallback), streaming when the answer shape is known."""
+        request = {
+            "model": self.ollama_model,
+            "prompt": prompt,
+            "think": False,
+            "keep_alive": self._ollama_keep_alive(),
+            "options": {"temperature": 0.5, "num_predict": max_tokens}
         }
+        if json_mode:
+            request["format"] = "json"
+        
+        # The Ollama SDK has its own HTTP client, record / replay it explicitly
+        if settings.ollama_streaming and shape and not json_mode:
+            return self.http.recorded_call(
+                "ollama_generate", {**request, "shape": shape}, lambda: self._ollama_stream(request, shape)
+            )
+        return self.http.recorded_call("ollama_generate", request, lambda: self._ollama_generate(request))
+    
+    @staticmethod
+    def _ollama_keep_alive():
+        """keep_alive setting as Ollama expects it: seconds as a number, otherwise a duration string."""
+        keep_alive = settings.ollama_keep_alive.strip()
+        return int(keep_alive) if keep_alive.lstrip('-').isdigit() else keep_alive
+    
+    def _ollama_generate(self, request: Dict[str, Any]) -> str:
+        started = time.time()
+        response = self.ollama_client.generate(**request)
+        self._log_ollama_call(started, response, streamed=False)
+        return response['response']
+    
+    def _ollama_stream(self, request: Dict[str, Any], shape: str) -> str:
+        """Stream an answer, closing the stream (which stops generation) once ``shape`` is complete."""
+        started = time.time()
+        first_token = None
+        text = ""
+        final = None
+        stream = self.ollama_client.generate(**request, stream=True)
+        try:
+            for chunk in stream:
+                if first_token is None and chunk['response']:
+                    first_token = time.time() - started
+                text += chunk['response']
+                if chunk['done']:
+                    final = chunk
+                    break
+                complete = self._complete_shape(text, shape)
+                if complete is not None:
+                    text = complete
+                    break
+        finally:
+            close = getattr(stream, 'close', None)
+            if close is not None:
+                close()
+        self._log_ollama_call(started, final, streamed=True, first_token=first_token)
+        return text
+    
+    @staticmethod
+    def _complete_shape(text: str, shape: str) -> Optional[str]:
+        """
+        Answer cut to the expected shape, or None while it is incomplete.
+        
+        Args:
+            text: Text streamed so far
+            shape: ``sentence`` (first complete sentence of at least 20 characters)
+                or ``lines:N`` (N complete non-empty lines, introductions skipped)
+        """
+        if shape == "sentence":
+            for match in SENTENCE_END_RE.finditer(text):
+                if len(text[:match.start()].strip()) >= 20:
+                    return text[:match.end()].strip()
+            return None
+        if shape.startswith("lines:"):
+            count = int(shape.split(":", 1)[1])
+            lines = [line for line in text.split('\n')[:-1] if line.strip() and not line.startswith('Voici')]
+            return '\n'.join(lines[:count]) if len(lines) >= count else None
+        return None
+    
+    def _log_ollama_call(
+        self, started: float, response: Optional[Any], streamed: bool, first_token: Optional[float] = None
+    ) -> None:
+        # load_duration is only reported by the last chunk, absent when the stream was stopped early
+        load_duration = response['load_duration'] if response is not None else None
+        logger.info(
+            "Ollama generation completed",
+            **log_step(
+                "ollama_generate",
+                model=self.ollama_model,
+                streamed=streamed,
+                early_stop=streamed and response is None,
+                first_token_seconds=round(first_token, 3) if first_token is not None else None,
+                load_seconds=round(load_duration / 1e9, 3) if load_duration else None,
+                duration=round(time.time() - started, 3)
+            )
+        )
+    
+    def start_ollama_warmup(self) -> Optional[threading.Thread]:
+        """
+        Load the Ollama model in the background at startup.
+        
+        With ``ollama_warmup=auto`` the model is only loaded when Ollama is the
+        first provider for summaries (no remote provider configured, or all
+        demoted), so memory is not taken for a model the run will not use.
+        
+        Returns:
+            Warm-up thread, or None when skipped
+        """
+        if settings.ollama_warmup == "off" or (self.http.replay is not None and self.http.replay.replaying):
+            return None
+        providers = [name for name, _ in self.registry.order("summary")]
+        if settings.ollama_warmup == "auto" and providers[:1] != ["Ollama"]:
+            return None
+        thread = threading.Thread(target=self.warm_up_ollama, name="ollama-warmup", daemon=True)
+        thread.start()
+        return thread
+    
+    def warm_up_ollama(self) -> Optional[float]:
+        """
+        Load the model (an empty prompt only loads it) and refresh its keep_alive.
+        
+        Returns:
+            Model load time in seconds (close to 0 when it was already resident),
+            None when Ollama is not reachable
+        """
+        started = time.time()
+        try:
+            response = self.ollama_client.generate(
+                model=self.ollama_model, prompt="", keep_alive=self._ollama_keep_alive()
+            )
+        except Exception as e:
+            logger.warning("Ollama warm-up failed", **log_step("ollama_warmup_failed", error=str(e)))
+            return None
+        load_seconds = round((response['load_duration'] or 0) / 1e9, 3)
+        logger.info(
+            "Ollama model ready",
+            **log_step("ollama_warmup", model=self.ollama_model, load_seconds=load_seconds,
+                       duration=round(time.time() - started, 3), keep_alive=settings.ollama_keep_alive)
+        )
+        return load_seconds
+    
+    def _fix_accents(self, text: str, repo_name: Optional[str] = None) -> str:
+        """Fix common missing French accents, keeping the case of each word and the repository name."""
+        accent_fixes = {**ACCENT_LEXICON, 'avance': 'avancé'}
+        skip = {word.lower() for word in WORD_RE.findall(repo_name or '')}
         
-        # Apply fixes only as whole words to avoid partial matches
-        import re
-        for wrong, correct in accent_fixes.items():
-            text = re.sub(r'\b' + re.escape(wrong) + r'\b', correct, text, flags=re.IGNORECASE)
+        def fix(match: re.Match) -> str:
+            word = match.group(0)
+            correct = accent_fixes.get(word.lower())
+            if not correct or word.lower() in skip:
+                return word
+            if len(word) > 1 and word.isupper():
+                return correct.upper()
+            return correct[0].upper() + correct[1:] if word[0].isupper() else correct
         
-        return text
\ No newline at end of file
+        # Whole words only, to avoid partial matches
+        return re.sub(r'\w+', fix, text)
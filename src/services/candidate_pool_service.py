@@ -0,0 +1,161 @@
+"""Persistent pool of trending candidates shared between runs."""
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ..core.config import settings
+from ..core.logger import logger, log_step
+from ..core.storage import atomic_write_json
+from .repo_identity import canonical_repo_key
+
+
+class CandidatePoolService:
+    """Service keeping unposted trending repositories between scheduler runs.
+
+    The pool is refilled from the trending sources only when it runs below a
+    low-water mark or its entries expire, so most runs make no trending request.
+    """
+
+    def __init__(self):
+        self.pool_file = Path(settings.data_dir) / "candidate_pool.json"
+        self.pool_file.parent.mkdir(exist_ok=True)
+        self.low_water_mark = settings.candidate_pool_low_water_mark
+        self.ttl_seconds = settings.candidate_pool_ttl_hours * 3600
+        self._load_pool()
+
+    def _load_pool(self) -> None:
+        """Load the pool from file and drop expired entries."""
+        try:
+            if self.pool_file.exists():
+                with open(self.pool_file, 'r', encoding='utf-8') as f:
+                    self.candidates: List[Dict[str, Any]] = json.load(f).get('candidates', [])
+            else:
+                self.candidates = []
+        except Exception as e:
+            logger.warning(
+                "Failed to load candidate pool, starting empty",
+                **log_step("candidate_pool_load_error", error=str(e))
+            )
+            self.candidates = []
+
+        expired = self._prune_expired()
+        logger.info(
+            "Candidate pool loaded",
+            **log_step("candidate_pool_loaded", size=len(self.candidates), expired=expired)
+        )
+
+    def _save_pool(self) -> None:
+        """Save the pool to file."""
+        try:
+            atomic_write_json(self.pool_file, {'candidates': self.candidates}, ensure_ascii=False)
+        except Exception as e:
+            logger.error(
+                "Failed to save candidate pool",
+                **log_step("candidate_pool_save_error", error=str(e))
+            )
+
+    def _prune_expired(self) -> int:
+        """Remove entries older than the TTL."""
+        cutoff = time.time() - self.ttl_seconds
+        before = len(self.candidates)
+        self.candidates = [c for c in self.candidates if c.get('added_at', 0) >= cutoff]
+        removed = before - len(self.candidates)
+        if removed:
+            self._save_pool()
+        return removed
+
+    @staticmethod
+    def _key(repo: Dict[str, Any]) -> Optional[str]:
+        return canonical_repo_key(repo.get('full_name') or repo.get('html_url'))
+
+    def size(self) -> int:
+        """Number of candidates in the pool."""
+        return len(self.candidates)
+
+    def needs_refill(self) -> bool:
+        """True when the pool is below its low-water mark."""
+        return len(self.candidates) < self.low_water_mark
+
+    def refill(self, repos: List[Dict[str, Any]]) -> int:
+        """
+        Add unposted repositories to the pool.
+
+        Args:
+            repos: Repositories already filtered against history
+
+        Returns:
+            Number of repositories added
+        """
+        known = {self._key(c['repo']) for c in self.candidates}
+        now = int(time.time())
+        added = 0
+        for repo in repos:
+            key = self._key(repo)
+            if not key or key in known:
+                continue
+            known.add(key)
+            self.candidates.append({'repo': dict(repo), 'added_at': now})
+            added += 1
+
+        if added:
+            self._save_pool()
+        logger.info(
+            "Candidate pool refilled",
+            **log_step("candidate_pool_refilled", added=added, size=len(self.candidates))
+        )
+        return added
+
+    def peek(self, history_service: Any) -> Optional[Dict[str, Any]]:
+        """
+        Return the next candidate that has not been posted since it was pooled.
+
+        The candidate stays in the pool until ``remove`` is called once it is
+        posted, so a failed generation, screenshot or post does not lose it.
+        Already posted candidates met on the way are dropped.
+
+        Args:
+            history_service: History used to skip already posted repositories
+
+        Returns:
+            Repository data or None when the pool is exhausted
+        """
+        repo = None
+        skipped = 0
+        while self.candidates:
+            candidate = self.candidates[0]['repo']
+            if history_service.is_already_posted(candidate['html_url']):
+                self.candidates.pop(0)
+                skipped += 1
+                continue
+            repo = candidate
+            break
+
+        if skipped:
+            self._save_pool()
+        logger.info(
+            "Candidate selected" if repo else "Candidate pool exhausted",
+            **log_step("candidate_pool_peek",
+                       repo=repo.get('full_name') if repo else None,
+                       skipped=skipped,
+                       remaining=len(self.candidates))
+        )
+        return repo
+
+    def remove(self, repo: Dict[str, Any]) -> bool:
+        """
+        Remove a posted repository from the pool.
+
+        Args:
+            repo: Repository data returned by ``peek``
+
+        Returns:
+            True when the repository was pooled
+        """
+        key = self._key(repo)
+        before = len(self.candidates)
+        self.candidates = [c for c in self.candidates if self._key(c['repo']) != key]
+        if len(self.candidates) == before:
+            return False
+        self._save_pool()
+        return True
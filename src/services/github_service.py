@@ -1,12 +1,20 @@
 """GitHub service for fetching trending repositories with fallbacks."""
-import requests
 import random
-import base64
 import re
-from typing import List, Dict, Any, Optional
-from bs4 import BeautifulSoup
+import threading
+import time
+from datetime import datetime, timedelta
+from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+from functools import partial
+from typing import List, Dict, Any, Optional, Tuple, Callable
 from ..core.config import settings
 from ..core.logger import logger, log_step
+from ..core.http_client import HttpClient, get_http_client
+from ..core.rate_budget import RateBudget, get_rate_budget
+from ..core.circuit_breaker import SourceHealth
+from .html_extract import RowExtractor
+from .repo_identity import canonical_repo_key
 
 class GitHubService:
     """Service for GitHub API interactions with multiple fallbacks."""
@@ -18,47 +26,163 @@ class GitHubService:
         "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
     ]
     
-    def __init__(self):
+    # Repositories enriched per GraphQL query
+    GRAPHQL_BATCH_SIZE = 25
+    
+    # Fields fetched for each repository during batch enrichment. READMEs are
+    # left out: blob text has no size limit, get_readme_content caps the download
+    GRAPHQL_REPO_FIELDS = """
+fragment RepoFields on Repository {
+  databaseId
+  nameWithOwner
+  description
+  stargazerCount
+  isArchived
+  pushedAt
+  primaryLanguage { name }
+  repositoryTopics(first: 10) { nodes { topic { name } } }
+}
+"""
+    
+    # Outcomes a source fetcher reports for the circuit breaker; a fetcher that
+    # reports nothing answered (an empty answer is not a failure)
+    OUTCOME_FAILED = "failed"
+    OUTCOME_SKIPPED = "skipped"  # Not called, e.g. search budget exhausted
+    
+    # Log message and step reported when a source succeeds in sequential mode
+    SOURCE_SUCCESS_LOGS = {
+        "github_api": ("Successfully fetched from GitHub API", "primary_success"),
+        "github_scrape": ("Successfully fetched from GitHub scraping fallback", "fallback1_success"),
+        "ossinsight": ("Successfully fetched from OSS Insight fallback", "fallback2_success"),
+        "gitstar": ("Successfully fetched from Gitstar fallback", "fallback3_success"),
+    }
+    
+    # Crawl periods: (GitHub Trending 'since', OSS Insight period, search API window in days)
+    CRAWL_PERIODS = {
+        "daily": ("daily", "past_24_hours", 1),
+        "weekly": ("weekly", "past_week", 7),
+        "monthly": ("monthly", "past_month", 30),
+    }
+    
+    # Weight of an appearance in each crawl period when ranking candidates
+    PERIOD_WEIGHTS = {"daily": 3.0, "weekly": 2.0, "monthly": 1.0}
+    
+    # GitHub Trending language slugs known by OSS Insight
+    OSSINSIGHT_LANGUAGES = {
+        "python": "Python", "javascript": "JavaScript", "typescript": "TypeScript",
+        "rust": "Rust", "go": "Go", "java": "Java", "c++": "C++", "c": "C",
+        "c#": "C#", "kotlin": "Kotlin", "swift": "Swift", "php": "PHP", "ruby": "Ruby",
+    }
+    
+    # Source whose repository data is used as base when merging, best first
+    SOURCE_PRECEDENCE = ("github_api", "github_scrape", "ossinsight", "gitstar")
+    
+    # Source whose value wins for each field when merging, best first
+    FIELD_PRECEDENCE = {
+        # OSS Insight reports the stars gained over the period, not a total
+        "stargazers_count": ("github_api", "github_scrape", "gitstar"),
+        "description": ("github_api", "github_scrape", "ossinsight", "gitstar"),
+        "language": ("github_api", "github_scrape", "ossinsight", "gitstar"),
+    }
+    
+    def __init__(
+        self,
+        http_client: Optional[HttpClient] = None,
+        rate_budget: Optional[RateBudget] = None,
+        source_health: Optional[SourceHealth] = None
+    ):
+        self.http = http_client or get_http_client()
+        self.rate_budget = rate_budget or get_rate_budget()
+        self.http.add_response_hook(self.rate_budget.record)
+        self.source_health = source_health or SourceHealth()
+        self.html_extractor = RowExtractor()
         self.base_url = "https://api.github.com"
         self.headers = {"Accept": "application/vnd.github.v3+json"}
         if settings.github_token:
             self.headers["Authorization"] = f"token {settings.github_token}"
+        
+        # README bytes not downloaded thanks to the byte budget, for this run
+        self.readme_bytes_saved = 0
+        
+        # Latency (seconds) of each source during the last concurrent fetch
+        self.last_source_latencies: Dict[str, Optional[float]] = {}
+        
+        # Outcome reported by the fetcher running in the current thread
+        self._outcome = threading.local()
+    
+    def _report(self, outcome: str) -> None:
+        """Report the outcome of the current fetcher call (see _timed_slice)."""
+        self._outcome.value = outcome
     
     def _parse_number(self, num_str: str) -> int:
         """Parse numbers with commas (e.g., '1,234' -> 1234)."""
         return int(re.sub(r'[^\d]', '', num_str)) if num_str else 0
     
-    def get_trending_repositories(self, limit: int = 10) -> List[Dict[str, Any]]:
+    def get_trending_repositories(
+        self,
+        limit: int = 10,
+        query: str = "created:>2024-01-01",
+        relative_dates: bool = False
+    ) -> List[Dict[str, Any]]:
         """
         Get trending repositories from GitHub API (with 3 retry attempts).
         
         Args:
             limit: Maximum number of repositories to return
+            query: GitHub search query
+            relative_dates: The query holds dates computed from now (keyed
+                relative to today in replay fixtures)
             
         Returns:
             List of repository data
         """
-        for attempt in range(3):
+        if self.rate_budget.is_exhausted("search"):
+            logger.warning(
+                "GitHub search budget exhausted, skipping API",
+                **log_step("github_api_budget_exhausted",
+                           reset_in=round(self.rate_budget.seconds_until_reset("search")))
+            )
+            self._report(self.OUTCOME_SKIPPED)
+            return []
+        
+        # Near the end of the budget: serve the cached answer and do not retry
+        budget_low = self.rate_budget.is_low("search")
+        attempts = 1 if budget_low else 3
+        
+        # Search for repositories created in the last week, sorted by stars
+        url = f"{self.base_url}/search/repositories"
+        params = {
+            "q": query,
+            "sort": "stars",
+            "order": "desc",
+            "per_page": limit
+        }
+        
+        for attempt in range(attempts):
             try:
                 logger.info(
                     "Fetching trending repositories from GitHub API", 
                     **log_step("github_api_fetch", limit=limit, attempt=attempt+1)
                 )
                 
-                # Search for repositories created in the last week, sorted by stars
-                url = f"{self.base_url}/search/repositories"
-                params = {
-                    "q": "created:>2024-01-01",
-                    "sort": "stars",
-                    "order": "desc",
-                    "per_page": limit
-                }
-                
-                response = requests.get(url, headers=self.headers, params=params, timeout=10)
+                self.rate_budget.pace("search")
+                response = self.http.cached_get(
+                    url, headers=self.headers, params=params, prefer_cache=budget_low,
+                    relative_dates=relative_dates, timeout=10
+                )
+                if response.status_code in (403, 429) and self.rate_budget.is_exhausted("search"):
+                    logger.error(
+                        "GitHub search rate limit reached, not retrying",
+                        **log_step("github_api_error", error=f"HTTP {response.status_code}")
+                    )
+                    self._report(self.OUTCOME_SKIPPED)
+                    return []
                 response.raise_for_status()
                 
                 data = response.json()
                 repositories = data.get("items", [])
+                for repo in repositories:
+                    repo["source"] = "github_api"
                 
                 logger.info(
                     "GitHub API trending repositories fetched",
@@ -72,73 +196,59 @@ class GitHubService:
                     f"GitHub API fetch attempt {attempt+1} failed",
                     **log_step("github_api_retry", error=str(e), attempt=attempt+1)
                 )
-                if attempt == 2:  # Last attempt
+                if attempt == attempts - 1:  # Last attempt
                     logger.error(
-                        "Failed to fetch trending repositories from GitHub API after 3 attempts",
+                        f"Failed to fetch trending repositories from GitHub API after {attempts} attempts",
                         **log_step("github_api_error", error=str(e))
                     )
         
+        self._report(self.OUTCOME_FAILED)
         return []
     
-    def scrape_github_trending_fallback(self, limit: int = 10) -> List[Dict[str, Any]]:
+    def scrape_github_trending_fallback(self, limit: int = 10, since: str = "daily", language: str = "") -> List[Dict[str, Any]]:
         """
         Scrape GitHub Trending page as fallback.
         
         Args:
             limit: Maximum number of repositories to return
+            since: Trending period ('daily', 'weekly' or 'monthly')
+            language: Language slug (e.g. 'python'), empty for all languages
             
         Returns:
             List of repository data
         """
         try:
-            logger.info("Attempting GitHub Trending scraping fallback", **log_step("github_scrape_start", limit=limit))
+            logger.info(
+                "Attempting GitHub Trending scraping fallback",
+                **log_step("github_scrape_start", limit=limit, since=since, language=language or "all")
+            )
             
-            url = "https://github.com/trending"
+            url = f"https://github.com/trending/{quote(language)}" if language else "https://github.com/trending"
             headers = {"User-Agent": random.choice(self.USER_AGENTS)}
-            response = requests.get(url, headers=headers, timeout=15)
+            params = {"since": since} if since != "daily" else None
+            response = self.http.get(url, headers=headers, params=params, timeout=15)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.text, 'html.parser')
             repos = []
             
-            for repo in soup.select("article.Box-row")[:limit]:
+            for row in self.html_extractor.trending_rows(response.text, limit):
                 try:
-                    # Extract repository name - CORRECTION COMPLÈTE ICI
-                    name_elem = repo.select_one("h2 a")
-                    if not name_elem:
-                        continue
-                    
-                    # Extraire le href qui contient le chemin complet du dépôt
-                    href = name_elem.get('href', '')
-                    if not href:
-                        continue
-                    
                     # Nettoyer le href pour obtenir le nom complet du dépôt
+                    href = row["href"]
                     full_name = href.strip('/')
                     repo_url = "https://github.com" + href
                     
                     # Extraire le nom du dépôt (sans le propriétaire) pour la clé 'name'
                     name = full_name.split('/')[-1] if '/' in full_name else full_name
                     
-                    # Extract description
-                    desc_elem = repo.select_one("p")
-                    description = desc_elem.text.strip() if desc_elem else ""
-                    
-                    # Extract language
-                    lang_elem = repo.select_one("span[itemprop='programmingLanguage']")
-                    language = lang_elem.text.strip() if lang_elem else ""
-                    
-                    # Extract star count
-                    stars_elem = repo.select_one("a[href$='/stargazers']")
-                    stars = self._parse_number(stars_elem.text.strip()) if stars_elem else 0
-                    
                     repos.append({
                         "name": name,  # Ajout de la clé 'name'
                         "full_name": full_name,
-                        "description": description,
-                        "language": language,
-                        "stargazers_count": stars,
-                        "html_url": repo_url
+                        "description": row["description"],
+                        "language": row["language"],
+                        "stargazers_count": self._parse_number(row["stars"]),
+                        "html_url": repo_url,
+                        "source": "github_scrape"
                     })
                 except Exception as e:
                     logger.warning(f"Error parsing repository: {str(e)}", **log_step("scrape_parse_error"))
@@ -155,27 +265,38 @@ class GitHubService:
                 f"GitHub Trending scraping fallback failed: {str(e)}",
                 **log_step("github_scrape_error", error=str(e))
             )
+            self._report(self.OUTCOME_FAILED)
             return []
     
-    def fetch_ossinsight_trending(self, limit: int = 10) -> List[Dict[str, Any]]:
+    def fetch_ossinsight_trending(
+        self,
+        limit: int = 10,
+        period: str = "past_24_hours",
+        language: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
         """
         Fetch trending repositories from OSS Insight API.
         
         Args:
             limit: Maximum number of repositories to return
+            period: 'past_24_hours', 'past_week', 'past_month' or 'past_3_months'
+            language: OSS Insight language name (e.g. 'Python'), None for all
             
         Returns:
             List of repository data
         """
         try:
-            logger.info("Attempting OSS Insight API fallback", **log_step("ossinsight_start", limit=limit))
+            logger.info(
+                "Attempting OSS Insight API fallback",
+                **log_step("ossinsight_start", limit=limit, period=period, language=language or "All")
+            )
             
             url = "https://api.ossinsight.io/v1/trends/repos/"
-            params = {
-                "period": "past_24_hours",  # Peut être ajusté selon les besoins
-            }
+            params = {"period": period}
+            if language:
+                params["language"] = language
             
-            response = requests.get(url, params=params, timeout=10)
+            response = self.http.get(url, params=params, timeout=10)
             response.raise_for_status()
             
             data = response.json()
@@ -189,7 +310,8 @@ class GitHubService:
                     "description": repo.get("description", ""),
                     "language": repo.get("primary_language", ""),
                     "stargazers_count": int(repo.get("stars", 0)),
-                    "html_url": f"https://github.com/{repo_name}"
+                    "html_url": f"https://github.com/{repo_name}",
+                    "source": "ossinsight"
                 })
             
             logger.info(
@@ -203,6 +325,7 @@ class GitHubService:
                 f"OSS Insight API fallback failed: {str(e)}",
                 **log_step("ossinsight_error", error=str(e))
             )
+            self._report(self.OUTCOME_FAILED)
             return []
     
     def fetch_gitstar_ranking(self, limit: int = 10) -> List[Dict[str, Any]]:
@@ -220,31 +343,24 @@ class GitHubService:
             
             url = "https://gitstar-ranking.com/repositories"
             headers = {"User-Agent": random.choice(self.USER_AGENTS)}
-            response = requests.get(url, headers=headers, timeout=10)
+            response = self.http.get(url, headers=headers, timeout=10)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.text, 'html.parser')
             repos = []
             
-            for row in soup.select("table tbody tr")[:limit]:
+            for row in self.html_extractor.gitstar_rows(response.text, limit):
                 try:
-                    name_elem = row.select_one("td:nth-child(2) a")
-                    if not name_elem:
-                        continue
-                    
-                    full_name = name_elem.text.strip()
-                    repo_url = "https://github.com" + name_elem["href"]
-                    
-                    stars_elem = row.select_one("td:nth-child(3)")
-                    stars = self._parse_number(stars_elem.text.strip()) if stars_elem else 0
+                    full_name = row["name"]
+                    repo_url = "https://github.com" + row["href"]
                     
                     repos.append({
                         "name": full_name.split('/')[-1],  # Ajout de la clé 'name'
                         "full_name": full_name,
                         "description": "",  # Gitstar doesn't provide descriptions
                         "language": "",     # Gitstar doesn't provide language
-                        "stargazers_count": stars,
-                        "html_url": repo_url
+                        "stargazers_count": self._parse_number(row["stars"]),
+                        "html_url": repo_url,
+                        "source": "gitstar"
                     })
                 except Exception as e:
                     logger.warning(f"Error parsing Gitstar repository: {str(e)}", **log_step("gitstar_parse_error"))
@@ -261,57 +377,339 @@ class GitHubService:
                 f"Gitstar Ranking fallback failed: {str(e)}",
                 **log_step("gitstar_error", error=str(e))
             )
+            self._report(self.OUTCOME_FAILED)
             return []
     
-    def get_trending_repositories_with_fallbacks(self, limit: int = 10) -> List[Dict[str, Any]]:
+    def _trending_sources(self) -> List[Tuple[str, Callable[[int], List[Dict[str, Any]]]]]:
         """
-        Get trending repositories with multiple fallback sources.
+        Trending sources to call, best first.
+        
+        Sources with an open circuit breaker are skipped and the others are
+        ordered by health score (preference order on ties). The search API goes
+        last when its rate budget is nearly exhausted.
+        """
+        sources = {
+            "github_api": self.get_trending_repositories,
+            "github_scrape": self.scrape_github_trending_fallback,
+            "ossinsight": self.fetch_ossinsight_trending,
+            "gitstar": self.fetch_gitstar_ranking,
+        }
+        names = self.source_health.order(list(sources))
+        if "github_api" in names and self.rate_budget.is_low("search"):
+            # Keep the last search calls for when nothing else works
+            names.append(names.pop(names.index("github_api")))
+        return [(name, self._monitored(name, sources[name])) for name in names]
+    
+    def fallback_sources(self) -> List[Tuple[str, Callable[[int], List[Dict[str, Any]]]]]:
+        """Healthy non-API trending sources, best first."""
+        return [(name, fetcher) for name, fetcher in self._trending_sources() if name != "github_api"]
+    
+    def _monitored(self, name: str, fetcher: Callable[[int], List[Dict[str, Any]]]) -> Callable[[int], List[Dict[str, Any]]]:
+        """Wrap a source fetcher to measure latency and feed its circuit breaker."""
+        def fetch(limit: int) -> List[Dict[str, Any]]:
+            if not self.source_health.claim_probe(name):
+                logger.info("Source probe already in flight", **log_step("source_probe_busy", source=name))
+                return []
+            repos, latency, outcome = self._timed_slice(fetcher, limit)
+            self.last_source_latencies[name] = round(latency, 3)
+            if outcome == self.OUTCOME_SKIPPED:
+                self.source_health.release_probe(name)
+            elif outcome == self.OUTCOME_FAILED:
+                self.source_health.record_failure(name, latency)
+            else:
+                self.source_health.record_success(name, latency)
+            return repos
+        return fetch
+    
+    def _timed_slice(
+        self,
+        fetcher: Callable[[int], List[Dict[str, Any]]],
+        limit: int
+    ) -> Tuple[List[Dict[str, Any]], float, Optional[str]]:
+        """Fetch one crawl slice, returning its repositories (empty on error), latency and reported outcome."""
+        self._outcome.value = None
+        started = time.monotonic()
+        try:
+            repos = fetcher(limit)
+        except Exception:
+            repos = []
+            self._report(self.OUTCOME_FAILED)
+        return repos, time.monotonic() - started, self._outcome.value
+    
+    def get_trending_repositories_concurrent(
+        self,
+        limit: int = 10,
+        merge: bool = False,
+        deadline: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Query every trending source at once.
         
         Args:
-            limit: Maximum number of repositories to return
+            limit: Maximum number of repositories to request from each source,
+                and to return once merged
+            merge: Merge all sources answering before the deadline instead of
+                returning the first non-empty result
+            deadline: Seconds to wait for sources (defaults to settings)
             
         Returns:
             List of repository data
         """
-        # 1. Try GitHub API first
-        repos = self.get_trending_repositories(limit)
-        if repos:
-            logger.info("Successfully fetched from GitHub API", **log_step("primary_success", count=len(repos)))
-            return repos
+        deadline = settings.trending_fetch_deadline if deadline is None else deadline
+        sources = self._trending_sources()
+        priority = [name for name, _ in sources]
+        results: Dict[str, List[Dict[str, Any]]] = {}
+        self.last_source_latencies = {name: None for name in priority}
+        if not sources:
+            return []
+        winner = None
         
-        logger.warning("GitHub API failed, trying fallbacks")
+        logger.info(
+            "Fetching trending repositories from all sources concurrently",
+            **log_step("trending_concurrent_start", limit=limit, merge=merge, deadline=deadline)
+        )
         
-        # 2. Fallback 1: Scrape GitHub Trending
-        repos = self.scrape_github_trending_fallback(limit)
-        if repos:
-            logger.info("Successfully fetched from GitHub scraping fallback", **log_step("fallback1_success", count=len(repos)))
-            return repos
+        executor = ThreadPoolExecutor(max_workers=len(sources), thread_name_prefix="trending")
+        futures = {executor.submit(fetcher, limit): name for name, fetcher in sources}
+        try:
+            for future in as_completed(futures, timeout=deadline):
+                name = futures[future]
+                repos = future.result()
+                results[name] = repos
+                if repos and not merge:
+                    winner = name
+                    break
+        except FuturesTimeoutError:
+            logger.warning(
+                "Trending sources deadline reached",
+                **log_step("trending_concurrent_deadline", deadline=deadline,
+                           pending=[name for name in priority if name not in results])
+            )
+        finally:
+            # Do not wait for slow sources, their results are discarded
+            executor.shutdown(wait=False, cancel_futures=True)
         
-        # 3. Fallback 2: OSS Insight API (remplace LibHunt)
-        repos = self.fetch_ossinsight_trending(limit)
-        if repos:
-            logger.info("Successfully fetched from OSS Insight fallback", **log_step("fallback2_success", count=len(repos)))
-            return repos
+        if merge:
+            repos = []
+            seen = set()
+            for name in priority:
+                for repo in results.get(name, []):
+                    key = canonical_repo_key(repo.get('full_name') or repo.get('html_url'))
+                    if key and key not in seen:
+                        seen.add(key)
+                        repos.append(repo)
+            repos = repos[:limit]
+        else:
+            repos = results.get(winner, []) if winner else []
         
-        # 4. Fallback 3: Gitstar Ranking
-        repos = self.fetch_gitstar_ranking(limit)
-        if repos:
-            logger.info("Successfully fetched from Gitstar fallback", **log_step("fallback3_success", count=len(repos)))
-            return repos
+        logger.info(
+            "Concurrent trending fetch completed",
+            **log_step("trending_concurrent_done",
+                       count=len(repos),
+                       winner=winner or ("merged" if merge else None),
+                       latencies=dict(self.last_source_latencies))
+        )
+        
+        if not repos:
+            logger.error("All trending sources failed or timed out")
+        return repos
+    
+    def _crawl_slices(self) -> List[Tuple[str, str, str, Callable[[int], List[Dict[str, Any]]]]]:
+        """Build (source, period, language, fetcher) slices for the configured crawl."""
+        slices = []
+        for period in settings.trending_crawl_periods:
+            if period not in self.CRAWL_PERIODS:
+                logger.warning(f"Unknown crawl period: {period}", **log_step("crawl_unknown_period", period=period))
+                continue
+            since, ossinsight_period, days = self.CRAWL_PERIODS[period]
+            
+            for language in settings.trending_crawl_languages:
+                slices.append((
+                    "github_scrape", period, language,
+                    partial(self.scrape_github_trending_fallback, since=since, language=language)
+                ))
+                ossinsight_language = self.OSSINSIGHT_LANGUAGES.get(language)
+                if not language or ossinsight_language:
+                    slices.append((
+                        "ossinsight", period, language,
+                        partial(self.fetch_ossinsight_trending, period=ossinsight_period, language=ossinsight_language)
+                    ))
+            
+            # One search per period (all languages) to spare the search budget
+            if not self.rate_budget.is_low("search"):
+                created_after = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+                slices.append((
+                    "github_api", period, "",
+                    partial(self.get_trending_repositories, query=f"created:>{created_after}", relative_dates=True)
+                ))
+        return slices
+    
+    def crawl_trending(self, limit: int = 25, deadline: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Crawl trending periods and language slices in parallel.
+        
+        Every configured period (daily/weekly/monthly) and language is fetched
+        from GitHub Trending, OSS Insight and the search API, then merged into
+        one ranked candidate set deduplicated by ``full_name``.
+        
+        Args:
+            limit: Maximum number of repositories per slice
+            deadline: Seconds to wait for slices (defaults to settings)
+            
+        Returns:
+            Ranked list of repository data
+        """
+        deadline = settings.trending_fetch_deadline if deadline is None else deadline
+        healthy = set(self.source_health.order(["github_api", "github_scrape", "ossinsight"]))
+        slices = []
+        for entry in self._crawl_slices():
+            source = entry[0]
+            if source not in healthy:
+                continue
+            if self.source_health.state(source) == SourceHealth.HALF_OPEN:
+                # A recovering source is probed with a single slice, claimed as it is submitted
+                if any(other[0] == source for other in slices) or not self.source_health.claim_probe(source):
+                    continue
+            slices.append(entry)
+        
+        logger.info(
+            "Crawling trending slices",
+            **log_step("crawl_start", slices=len(slices), periods=settings.trending_crawl_periods,
+                       languages=[language or "all" for language in settings.trending_crawl_languages])
+        )
+        
+        started = time.monotonic()
+        results = []
+        latencies: Dict[str, List[float]] = {}
+        outcomes: Dict[str, List[Optional[str]]] = {}
+        executor = ThreadPoolExecutor(max_workers=settings.trending_crawl_workers, thread_name_prefix="crawl")
+        futures = {
+            executor.submit(self._timed_slice, fetcher, limit): (source, period, language)
+            for source, period, language, fetcher in slices
+        }
+        try:
+            for future in as_completed(futures, timeout=deadline):
+                slice_repos, latency, outcome = future.result()
+                source = futures[future][0]
+                latencies.setdefault(source, []).append(latency)
+                outcomes.setdefault(source, []).append(outcome)
+                results.append((*futures[future], slice_repos))
+        except FuturesTimeoutError:
+            logger.warning(
+                "Trending crawl deadline reached",
+                **log_step("crawl_deadline", deadline=deadline, completed=len(results), total=len(slices))
+            )
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        # One breaker result per source: one answered slice is a success, slices
+        # skipped for budget count neither way, none back by the deadline is a failure
+        for source in {entry[0] for entry in slices}:
+            source_outcomes = outcomes.get(source, [])
+            latency = max(latencies.get(source, [time.monotonic() - started]))
+            self.last_source_latencies[source] = round(latency, 3)
+            if any(outcome is None for outcome in source_outcomes):
+                self.source_health.record_success(source, latency)
+            elif source_outcomes and all(outcome == self.OUTCOME_SKIPPED for outcome in source_outcomes):
+                self.source_health.release_probe(source)
+            else:
+                self.source_health.record_failure(source, latency)
+        
+        repos = self._merge_ranked(results)
+        
+        logger.info(
+            "Trending crawl completed",
+            **log_step("crawl_success", count=len(repos),
+                       slices_ok=sum(1 for *_, slice_repos in results if slice_repos),
+                       slices_total=len(slices))
+        )
+        return repos
+    
+    def _merge_ranked(self, results: List[Tuple[str, str, str, List[Dict[str, Any]]]]) -> List[Dict[str, Any]]:
+        """Merge slice results by canonical full_name, applying field precedence and ranking."""
+        merged: Dict[str, Dict[str, Any]] = {}
+        for source, period, language, repos in results:
+            weight = self.PERIOD_WEIGHTS.get(period, 1.0)
+            for position, repo in enumerate(repos):
+                key = canonical_repo_key(repo.get('full_name') or repo.get('html_url'))
+                if not key:
+                    continue
+                entry = merged.setdefault(key, {"by_source": {}, "score": 0.0, "slices": []})
+                entry["by_source"].setdefault(source, repo)
+                # Top of a list counts up to twice as much as its bottom
+                entry["score"] += weight * (1 - position / (2 * len(repos)))
+                entry["slices"].append(f"{source}:{period}:{language or 'all'}")
+        
+        ranked = []
+        for entry in merged.values():
+            by_source = entry["by_source"]
+            base = next(source for source in self.SOURCE_PRECEDENCE if source in by_source)
+            repo = dict(by_source[base])
+            for field, precedence in self.FIELD_PRECEDENCE.items():
+                origin = next((source for source in precedence
+                               if source in by_source and by_source[source].get(field)), None)
+                if origin:
+                    repo[field] = by_source[origin][field]
+                if field == "stargazers_count":
+                    repo["stargazers_source"] = origin or base
+            repo["sources"] = sorted(by_source)
+            repo["trending_slices"] = entry["slices"]
+            repo["trending_score"] = round(entry["score"], 3)
+            ranked.append(repo)
+        
+        ranked.sort(key=lambda repo: repo["trending_score"], reverse=True)
+        return ranked
+    
+    def get_trending_repositories_with_fallbacks(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Get trending repositories with multiple fallback sources.
+        
+        Sources are tried one after another unless ``settings.trending_fetch_mode``
+        selects a concurrent mode or the multi-period crawl.
+        
+        Args:
+            limit: Maximum number of repositories to return
+            
+        Returns:
+            List of repository data
+        """
+        mode = settings.trending_fetch_mode
+        if mode == "crawl":
+            repos = self.crawl_trending(limit)
+            if repos:
+                return repos[:limit]
+            logger.warning("Trending crawl returned nothing, trying sequential sources")
+        elif mode in ("concurrent_first", "concurrent_merge"):
+            return self.get_trending_repositories_concurrent(limit, merge=(mode == "concurrent_merge"))
+        
+        # GitHub API first, then scraping, OSS Insight and Gitstar (reordered by source health)
+        for name, fetcher in self._trending_sources():
+            repos = fetcher(limit)
+            if repos:
+                message, step = self.SOURCE_SUCCESS_LOGS[name]
+                logger.info(message, **log_step(step, count=len(repos)))
+                return repos
+            if name == "github_api":
+                logger.warning("GitHub API failed, trying fallbacks")
         
         logger.error("All fallbacks failed")
         return []
     
-    def get_readme_content(self, repo_url: str) -> Optional[str]:
+    def get_readme_content(self, repo_url: str, max_bytes: Optional[int] = None) -> Optional[str]:
         """
         Get README content from repository (with 3 retry attempts).
         
+        The download is streamed and stops at the byte budget: prompts only
+        use the beginning of the README.
+        
         Args:
             repo_url: Repository URL (e.g., https://github.com/owner/repo)
+            max_bytes: Byte budget (defaults to settings, 0 for the whole file)
             
         Returns:
             README content or None
         """
+        max_bytes = settings.readme_max_bytes if max_bytes is None else max_bytes
         for attempt in range(3):
             try:
                 # Extract owner and repo from URL
@@ -326,28 +724,43 @@ class GitHubService:
                     **log_step("readme_fetch", owner=owner, repo=repo, attempt=attempt+1)
                 )
                 
-                # Try different README file names
-                for readme_name in ["README.md", "README.rst", "README.txt", "README"]:
-                    url = f"{self.base_url}/repos/{owner}/{repo}/contents/{readme_name}"
-                    response = requests.get(url, headers=self.headers, timeout=10)
-                    
-                    if response.status_code == 200:
-                        data = response.json()
-                        if data.get("encoding") == "base64":
-                            content = base64.b64decode(data["content"]).decode("utf-8")
-                            
-                            logger.info(
-                                "README fetched successfully",
-                                **log_step("readme_success", filename=readme_name, length=len(content), attempt=attempt+1)
-                            )
-                            
-                            return content
+                # Single request: GitHub resolves the README name/location and
+                # the raw media type returns the file itself (no JSON/base64)
+                url = f"{self.base_url}/repos/{owner}/{repo}/readme"
+                headers = {**self.headers, "Accept": "application/vnd.github.raw"}
+                budget_low = self.rate_budget.is_low("core")
+                self.rate_budget.pace("core")
+                response = self.http.cached_get(
+                    url, headers=headers, prefer_cache=budget_low, max_bytes=max_bytes or None, timeout=10
+                )
                 
-                logger.warning(
-                    "README not found", 
-                    **log_step("readme_not_found", attempt=attempt+1)
+                if response.status_code == 404:
+                    logger.warning(
+                        "README not found", 
+                        **log_step("readme_not_found", attempt=attempt+1)
+                    )
+                    return None
+                
+                if response.status_code in (403, 429) and self.rate_budget.is_exhausted("core"):
+                    logger.error(
+                        "GitHub rate limit reached, not retrying README fetch",
+                        **log_step("readme_error", error=f"HTTP {response.status_code}")
+                    )
+                    return None
+                
+                response.raise_for_status()
+                # A cut at the byte budget may split the last UTF-8 character
+                content = response.content.decode("utf-8", errors="ignore")
+                bytes_saved = getattr(response, "bytes_saved", 0)
+                self.readme_bytes_saved += bytes_saved
+                
+                logger.info(
+                    "README fetched successfully",
+                    **log_step("readme_success", length=len(content), attempt=attempt+1,
+                               truncated=getattr(response, "truncated", False), bytes_saved=bytes_saved)
                 )
-                return None
+                
+                return content
                 
             except Exception as e:
                 logger.warning(
@@ -360,4 +773,104 @@ class GitHubService:
                         **log_step("readme_error", error=str(e))
                     )
         
-        return None
\ No newline at end of file
+        return None
+    
+    def _repo_owner_and_name(self, repo: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+        """Extract (owner, name) from repository data."""
+        full_name = repo.get('full_name') or repo.get('html_url', '').replace("https://github.com/", "")
+        parts = full_name.strip('/').split('/')
+        if len(parts) < 2 or not parts[0] or not parts[1]:
+            return None
+        return parts[0], parts[1]
+    
+    def enrich_repositories(self, repos: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Fill stars, language, description, topics, archived flag and pushed-at
+        for a whole candidate list with batched GraphQL queries.
+        
+        The GraphQL API requires a token; without one the list is returned as is.
+        
+        Args:
+            repos: Repository data from any trending source
+            
+        Returns:
+            The same repositories with enriched fields
+        """
+        if not repos:
+            return repos
+        if not settings.github_token:
+            logger.info("GraphQL enrichment skipped, no GitHub token", **log_step("graphql_enrich_skipped"))
+            return repos
+        if self.rate_budget.is_low("graphql"):
+            logger.warning(
+                "GraphQL enrichment skipped, rate budget nearly exhausted",
+                **log_step("graphql_enrich_skipped", remaining=self.rate_budget.remaining("graphql"))
+            )
+            return repos
+        
+        for start in range(0, len(repos), self.GRAPHQL_BATCH_SIZE):
+            batch = repos[start:start + self.GRAPHQL_BATCH_SIZE]
+            try:
+                self._enrich_batch(batch)
+            except Exception as e:
+                logger.warning(
+                    f"GraphQL enrichment failed: {str(e)}",
+                    **log_step("graphql_enrich_error", error=str(e), batch_size=len(batch))
+                )
+        
+        return repos
+    
+    def _enrich_batch(self, batch: List[Dict[str, Any]]) -> None:
+        """Enrich one batch of repositories in place with a single GraphQL query."""
+        variables: Dict[str, str] = {}
+        declarations = []
+        selections = []
+        aliases: Dict[str, Dict[str, Any]] = {}
+        
+        for index, repo in enumerate(batch):
+            owner_and_name = self._repo_owner_and_name(repo)
+            if not owner_and_name:
+                continue
+            variables[f"o{index}"], variables[f"n{index}"] = owner_and_name
+            declarations.append(f"$o{index}: String!, $n{index}: String!")
+            selections.append(f"  r{index}: repository(owner: $o{index}, name: $n{index}) {{ ...RepoFields }}")
+            aliases[f"r{index}"] = repo
+        
+        if not aliases:
+            return
+        
+        query = f"query({', '.join(declarations)}) {{\n" + "\n".join(selections) + "\n}\n" + self.GRAPHQL_REPO_FIELDS
+        
+        logger.info("Enriching repositories with GraphQL", **log_step("graphql_enrich_start", count=len(aliases)))
+        
+        response = self.http.post(
+            f"{self.base_url}/graphql",
+            headers={"Authorization": f"bearer {settings.github_token}"},
+            json={"query": query, "variables": variables},
+            timeout=20
+        )
+        response.raise_for_status()
+        data = response.json().get("data") or {}
+        
+        enriched = 0
+        for alias, repo in aliases.items():
+            node = data.get(alias)
+            if not node:
+                continue  # Repository renamed, deleted or private
+            
+            repo["id"] = node.get("databaseId") or repo.get("id")
+            repo["name_with_owner"] = node.get("nameWithOwner")  # Current name, redirects resolved
+            repo["description"] = repo.get("description") or node.get("description") or ""
+            repo["language"] = repo.get("language") or (node.get("primaryLanguage") or {}).get("name") or ""
+            if node.get("stargazerCount") is not None:
+                repo["stargazers_count"] = node["stargazerCount"]
+                repo["stargazers_source"] = "graphql"
+            repo["topics"] = [n["topic"]["name"] for n in (node.get("repositoryTopics") or {}).get("nodes", [])]
+            repo["archived"] = node.get("isArchived", False)
+            repo["pushed_at"] = node.get("pushedAt")
+            enriched += 1
+        
+        logger.info(
+            "GraphQL enrichment completed",
+            **log_step("graphql_enrich_success", requested=len(aliases), enriched=enriched)
+        )
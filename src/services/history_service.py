@@ -1,11 +1,14 @@
 """History service to track posted repositories."""
-import json
+import time
 from pathlib import Path
 from datetime import datetime
-from typing import Set, Dict, Any
+from typing import Set, Dict, Any, Optional
 
 from ..core.config import settings
 from ..core.logger import logger, log_step
+from .history_store import JsonHistoryStore, SqliteHistoryStore
+from .repo_identity import RepoIdentityIndex
+from .history_stats import HistoryStats
 
 
 class HistoryService:
@@ -14,63 +17,79 @@ class HistoryService:
     def __init__(self):
         self.history_file = Path(settings.data_dir) / "posted_repos.json"
         self.history_file.parent.mkdir(exist_ok=True)
+        if settings.history_backend == "sqlite":
+            self.store = SqliteHistoryStore(self.history_file.with_suffix(".db"), self.history_file)
+        else:
+            self.store = JsonHistoryStore(self.history_file)
+        self.identity = RepoIdentityIndex()
         self._load_history()
+        self.stats = HistoryStats()
+        if not self.stats.exists() and self.last_posts:
+            self.stats.backfill(self.last_posts)
     
     def _load_history(self) -> None:
-        """Load posting history from file."""
+        """Load posting history from the storage backend."""
         try:
-            if self.history_file.exists():
-                with open(self.history_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.posted_repos: Set[str] = set(data.get('repos', []))
-                    self.last_posts: Dict[str, str] = data.get('last_posts', {})
-            else:
-                self.posted_repos = set()
-                self.last_posts = {}
-                
+            self.store.load()
             logger.info(
                 "History loaded",
-                **log_step("history_loaded", count=len(self.posted_repos))
+                **log_step("history_loaded", count=len(self.store.posted_repos), backend=settings.history_backend)
             )
         except Exception as e:
             logger.warning(
                 "Failed to load history, starting fresh",
                 **log_step("history_load_error", error=str(e))
             )
-            self.posted_repos = set()
-            self.last_posts = {}
+            self.store.posted_repos = set()
+            self.store.last_posts = {}
+        
+        self.posted_repos: Set[str] = self.store.posted_repos
+        self.last_posts: Dict[str, Dict[str, Any]] = self.store.last_posts
+        self._index_posted()
+    
+    def _index_posted(self) -> None:
+        """Build the set of canonical identities of posted repositories."""
+        keys = (self.identity.key(url) for url in self.posted_repos)
+        self.posted_keys: Set[str] = {key for key in keys if key is not None}
     
-    def _save_history(self) -> None:
-        """Save posting history to file."""
+    def is_already_posted(self, repo_url: str) -> bool:
+        """Check if repository was already posted (any casing, trailing slash or former name)."""
+        if repo_url in self.posted_repos:
+            return True
+        key = self.identity.key(repo_url)
+        return key is not None and key in self.posted_keys
+    
+    def mark_as_posted(self, repo_url: str, tweet_id: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Mark repository as posted.
+        
+        Args:
+            repo_url: Repository URL
+            tweet_id: Main tweet ID
+            metadata: Analytics fields kept with the entry: language, source,
+                channel ("api" / "firefox"), fetch_to_post (seconds) and
+                stages ({stage: seconds})
+        """
+        posted_at = datetime.now()
+        post_info = {
+            'tweet_id': tweet_id,
+            'posted_at': posted_at.isoformat(),
+            'posted_at_epoch': int(posted_at.timestamp()),
+            **(metadata or {})
+        }
         try:
-            data = {
-                'repos': list(self.posted_repos),
-                'last_posts': self.last_posts,
-                'updated_at': datetime.now().isoformat()
-            }
-            
-            with open(self.history_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-                
+            self.store.add(repo_url, post_info)
+            key = self.identity.key(repo_url)
+            if key is not None:
+                self.posted_keys.add(key)
             logger.info("History saved", **log_step("history_saved"))
+            # Only count posts that made it to the history (record() logs its own errors)
+            self.stats.record(post_info)
         except Exception as e:
             logger.error(
                 "Failed to save history",
                 **log_step("history_save_error", error=str(e))
             )
-    
-    def is_already_posted(self, repo_url: str) -> bool:
-        """Check if repository was already posted."""
-        return repo_url in self.posted_repos
-    
-    def mark_as_posted(self, repo_url: str, tweet_id: str) -> None:
-        """Mark repository as posted."""
-        self.posted_repos.add(repo_url)
-        self.last_posts[repo_url] = {
-            'tweet_id': tweet_id,
-            'posted_at': datetime.now().isoformat()
-        }
-        self._save_history()
         
         logger.info(
             "Repository marked as posted",
@@ -78,8 +97,21 @@ class HistoryService:
         )
     
     def get_unposted_repos(self, repos: list) -> list:
-        """Filter out already posted repositories."""
-        unposted = [repo for repo in repos if not self.is_already_posted(repo['html_url'])]
+        """Filter out already posted repositories and duplicates between sources."""
+        if self.identity.observe(repos):
+            self._index_posted()
+        
+        unposted = []
+        seen = set()
+        for repo in repos:
+            key = self.identity.key(repo)
+            if key is not None and (key in seen or key in self.posted_keys):
+                continue
+            if self.is_already_posted(repo['html_url']):
+                continue
+            if key is not None:
+                seen.add(key)
+            unposted.append(repo)
         
         logger.info(
             "Filtered repositories",
@@ -92,27 +124,20 @@ class HistoryService:
         return unposted
     
     def clear_old_history(self, days: int = 30) -> None:
-        """Clear history older than specified days."""
-        from datetime import timedelta
-        
-        cutoff_date = datetime.now() - timedelta(days=days)
-        old_repos = []
-        
-        for repo_url, post_info in list(self.last_posts.items()):
-            try:
-                posted_at = datetime.fromisoformat(post_info['posted_at'])
-                if posted_at < cutoff_date:
-                    old_repos.append(repo_url)
-                    self.posted_repos.discard(repo_url)
-                    del self.last_posts[repo_url]
-            except (KeyError, ValueError):
-                # Remove invalid entries
-                old_repos.append(repo_url)
-                self.posted_repos.discard(repo_url)
-                self.last_posts.pop(repo_url, None)
+        """Clear history older than specified days (only expired entries are visited)."""
+        old_repos = self.store.expired(int(time.time()) - days * 86400)
         
         if old_repos:
-            self._save_history()
+            try:
+                self.store.remove(old_repos)
+                # Rebuilt rather than subtracted: another URL variant of a removed repo may still be recent
+                self._index_posted()
+            except Exception as e:
+                logger.error(
+                    "Failed to save history",
+                    **log_step("history_save_error", error=str(e))
+                )
+                return
             logger.info(
                 "Old history cleared",
                 **log_step("history_cleared", removed=len(old_repos), days=days)
@@ -0,0 +1,146 @@
+"""Incrementally maintained posting analytics."""
+import json
+import statistics
+from bisect import insort
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ..core.config import settings
+from ..core.logger import logger, log_step
+from ..core.storage import atomic_write_json, file_lock
+
+
+class HistoryStats:
+    """Aggregates updated at every post, so reports never scan the history.
+
+    ``data/history_stats.json`` holds posts per day, counters per language,
+    source and posting channel, sorted fetch-to-post delays (exact median)
+    and per-stage duration totals. Aggregates are all-time: pruning the
+    posting history does not change them.
+    """
+
+    DIMENSIONS = ("language", "source", "channel")
+    UNKNOWN = "unknown"
+
+    def __init__(self, stats_file: Optional[str] = None):
+        self.stats_file = Path(stats_file) if stats_file else Path(settings.data_dir) / "history_stats.json"
+        self.stats_file.parent.mkdir(parents=True, exist_ok=True)
+        self.data = self._read()
+
+    @classmethod
+    def _empty(cls) -> Dict[str, Any]:
+        return {
+            'total': 0,
+            'per_day': {},
+            **{dimension: {} for dimension in cls.DIMENSIONS},
+            'fetch_to_post': [],
+            'stages': {}
+        }
+
+    def _read(self) -> Dict[str, Any]:
+        try:
+            if self.stats_file.exists():
+                with open(self.stats_file, 'r', encoding='utf-8') as f:
+                    return {**self._empty(), **json.load(f)}
+        except Exception as e:
+            logger.warning(
+                "Failed to load history stats, starting empty",
+                **log_step("history_stats_load_error", error=str(e))
+            )
+        return self._empty()
+
+    def exists(self) -> bool:
+        return self.stats_file.exists()
+
+    def _apply(self, post_info: Dict[str, Any]) -> None:
+        data = self.data
+        data['total'] += 1
+        day = str(post_info.get('posted_at', ''))[:10] or self.UNKNOWN
+        data['per_day'][day] = data['per_day'].get(day, 0) + 1
+        for dimension in self.DIMENSIONS:
+            value = post_info.get(dimension) or self.UNKNOWN
+            data[dimension][value] = data[dimension].get(value, 0) + 1
+        if post_info.get('fetch_to_post') is not None:
+            insort(data['fetch_to_post'], round(post_info['fetch_to_post'], 1))
+        for stage, seconds in (post_info.get('stages') or {}).items():
+            total, count = data['stages'].get(stage, (0.0, 0))
+            data['stages'][stage] = (round(total + seconds, 3), count + 1)
+
+    def record(self, post_info: Dict[str, Any]) -> None:
+        """
+        Add one post to the aggregates (read-modify-write under the file lock).
+
+        Args:
+            post_info: History entry: posted_at, language, source, channel,
+                fetch_to_post (seconds) and stages ({stage: seconds})
+        """
+        try:
+            with file_lock(self.stats_file):
+                self.data = self._read()
+                self._apply(post_info)
+                atomic_write_json(self.stats_file, self.data, ensure_ascii=False)
+        except Exception as e:
+            logger.warning("Failed to update history stats", **log_step("history_stats_save_error", error=str(e)))
+
+    def backfill(self, last_posts: Dict[str, Dict[str, Any]]) -> None:
+        """Build the aggregates once from an existing history (entries without metadata count as unknown)."""
+        with file_lock(self.stats_file):
+            if self.stats_file.exists():
+                # Another process built or recorded them since the caller checked
+                self.data = self._read()
+                return
+            self.data = self._empty()
+            for post_info in sorted(last_posts.values(), key=lambda info: info.get('posted_at') or ''):
+                self._apply(post_info)
+            atomic_write_json(self.stats_file, self.data, ensure_ascii=False)
+        logger.info("History stats rebuilt", **log_step("history_stats_backfill", posts=self.data['total']))
+
+    # Queries
+
+    def total(self) -> int:
+        """Number of posts recorded."""
+        return self.data['total']
+
+    def posts_per_day(self, days: Optional[int] = None) -> Dict[str, int]:
+        """
+        Posts per calendar day, oldest first.
+
+        Args:
+            days: Only the last ``days`` days (all history when None)
+        """
+        per_day = self.data['per_day']
+        if days is not None:
+            since = (date.today() - timedelta(days=days - 1)).isoformat()
+            per_day = {day: count for day, count in per_day.items() if day >= since}
+        return dict(sorted(per_day.items()))
+
+    def share(self, dimension: str) -> Dict[str, float]:
+        """Share of posts (0-1) per language, source or channel, largest first."""
+        counts = self.data[dimension]
+        total = sum(counts.values()) or 1
+        return {value: count / total for value, count in sorted(counts.items(), key=lambda item: -item[1])}
+
+    def counts(self, dimension: str) -> Dict[str, int]:
+        """Number of posts per language, source or channel."""
+        return dict(self.data[dimension])
+
+    def median_fetch_to_post(self) -> Optional[float]:
+        """Median seconds between fetching a repository and posting it."""
+        values: List[float] = self.data['fetch_to_post']
+        return statistics.median(values) if values else None
+
+    def average_stage_durations(self) -> Dict[str, float]:
+        """Average seconds spent in each workflow stage."""
+        return {stage: total / count for stage, (total, count) in self.data['stages'].items() if count}
+
+    def summary(self, days: Optional[int] = None) -> Dict[str, Any]:
+        """All aggregates in one dictionary."""
+        return {
+            'total': self.total(),
+            'posts_per_day': self.posts_per_day(days),
+            **{f"{dimension}_share": self.share(dimension) for dimension in self.DIMENSIONS},
+            'median_fetch_to_post': self.median_fetch_to_post(),
+            'average_stage_durations': self.average_stage_durations(),
+            'generated_at': datetime.now().isoformat()
+        }
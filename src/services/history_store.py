@@ -0,0 +1,339 @@
+"""Storage backends for the posting history."""
+import heapq
+import json
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from ..core.config import settings
+from ..core.logger import logger, log_step
+from ..core.storage import append_journal, atomic_write_json, atomic_write_text, file_lock, read_journal
+
+
+def posted_epoch(post_info: Dict[str, Any]) -> int:
+    """Posting time as a Unix timestamp, parsed from ISO only for entries written before it was stored."""
+    epoch = post_info.get('posted_at_epoch')
+    if epoch is not None:
+        return epoch
+    try:
+        return int(datetime.fromisoformat(post_info['posted_at']).timestamp())
+    except (KeyError, ValueError, TypeError):
+        return 0  # Invalid entries expire at the first pruning
+
+
+class JsonHistoryStore:
+    """JSON snapshot (``posted_repos.json``) plus an append-only journal.
+
+    Each change appends one fsynced line to ``posted_repos.journal`` under
+    an advisory file lock, after catching up with lines written by other
+    processes. The snapshot is only rewritten (temp file, fsync, rename)
+    when the journal grows past ``history_journal_max_entries``. The journal
+    starts with the generation of the snapshot it applies to, so a crash
+    between the two writes never replays entries twice.
+
+    An expiry heap of ``(posted_at_epoch, repo_url)`` is kept with the
+    snapshot, so pruning pops expired entries only. Entries removed or
+    re-posted meanwhile are discarded lazily when they reach the top.
+    """
+
+    def __init__(self, history_file: Path):
+        self.history_file = history_file
+        self.journal_file = history_file.with_suffix(".journal")
+        self.max_journal_entries = settings.history_journal_max_entries
+        self.posted_repos: Set[str] = set()
+        self.last_posts: Dict[str, Dict[str, Any]] = {}
+        self.expiry: List[Tuple[int, str]] = []
+        self.generation = 0
+        self.journal_offset = 0
+        self.journal_entries = 0
+        self.journal_stale = False
+
+    def load(self) -> None:
+        """Load the snapshot and replay the journal."""
+        with file_lock(self.history_file):
+            self._reload()
+
+    def _reload(self) -> None:
+        # Updated in place: HistoryService holds references to these containers
+        self.posted_repos.clear()
+        self.last_posts.clear()
+        self.expiry = []
+        self.generation = 0
+        data = {}
+        if self.history_file.exists():
+            try:
+                with open(self.history_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except ValueError as e:
+                # Keep the damaged file aside instead of overwriting it at the next save
+                corrupt_file = self.history_file.with_name(f"{self.history_file.name}.corrupt-{int(time.time())}")
+                self.history_file.replace(corrupt_file)
+                logger.error(
+                    "History snapshot is corrupted, moved aside",
+                    **log_step("history_corrupted", error=str(e), path=str(corrupt_file))
+                )
+                data = {}
+            self.posted_repos.update(data.get('repos', []))
+            self.last_posts.update(data.get('last_posts', {}))
+            self.generation = data.get('generation', 0)
+        
+        if 'expiry' in data:
+            self.expiry = [tuple(entry) for entry in data['expiry']]  # Stored sorted, a valid heap
+            heapq.heapify(self.expiry)
+        else:
+            # Snapshot written before the expiry index: built in memory, saved at the next compaction
+            for repo_url, post_info in self.last_posts.items():
+                post_info['posted_at_epoch'] = posted_epoch(post_info)
+                self.expiry.append((post_info['posted_at_epoch'], repo_url))
+            heapq.heapify(self.expiry)
+        self.journal_offset = 0
+        self.journal_entries = 0
+        self._sync(allow_reload=False)
+
+    def _journal_generation(self) -> Optional[int]:
+        """Generation written at the top of the journal, None without journal."""
+        if not self.journal_file.exists():
+            return None
+        with open(self.journal_file, 'r', encoding='utf-8') as f:
+            try:
+                return json.loads(f.readline()).get('generation')
+            except (ValueError, AttributeError):
+                return None
+
+    def _sync(self, allow_reload: bool = True) -> None:
+        """Apply journal lines written since the last sync (lock held)."""
+        generation = self._journal_generation()
+        if generation is None:
+            self.journal_stale = True
+            return
+        if generation < self.generation:
+            # Crash after a compaction, before the journal was reset: already in the snapshot
+            self.journal_stale = True
+            return
+        if generation > self.generation and allow_reload:
+            # Another process compacted the journal into a newer snapshot
+            self._reload()
+            return
+
+        records, self.journal_offset = read_journal(self.journal_file, self.journal_offset)
+        for record in records:
+            if record.get('op') == 'add':
+                post_info = record['post_info']
+                post_info['posted_at_epoch'] = posted_epoch(post_info)
+                self.posted_repos.add(record['repo_url'])
+                self.last_posts[record['repo_url']] = post_info
+                heapq.heappush(self.expiry, (post_info['posted_at_epoch'], record['repo_url']))
+            elif record.get('op') == 'remove':
+                for repo_url in record['repo_urls']:
+                    self.posted_repos.discard(repo_url)
+                    self.last_posts.pop(repo_url, None)
+            else:
+                continue
+            self.journal_entries += 1
+        self.journal_stale = False
+
+    def _reset_journal(self) -> None:
+        header = json.dumps({'generation': self.generation}) + "\n"
+        atomic_write_text(self.journal_file, header)
+        self.journal_offset = len(header.encode('utf-8'))
+        self.journal_entries = 0
+        self.journal_stale = False
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        """Append one change to the journal, compacting it when it is too long (lock held)."""
+        if self.journal_stale:
+            self._reset_journal()
+        append_journal(self.journal_file, record)
+        self._sync(allow_reload=False)
+        if self.journal_entries >= self.max_journal_entries:
+            self._compact()
+
+    def _compact(self) -> None:
+        """Rewrite the snapshot with the journal applied, then start a new journal."""
+        self.generation += 1
+        self.expiry = sorted(
+            (epoch, repo_url) for epoch, repo_url in self.expiry if self._is_live(epoch, repo_url)
+        )
+        atomic_write_json(self.history_file, {
+            'repos': list(self.posted_repos),
+            'last_posts': self.last_posts,
+            'expiry': self.expiry,
+            'generation': self.generation,
+            'updated_at': datetime.now().isoformat()
+        }, indent=2, ensure_ascii=False)
+        self._reset_journal()
+
+    def add(self, repo_url: str, post_info: Dict[str, Any]) -> None:
+        """Record a posted repository (one journal line)."""
+        with file_lock(self.history_file):
+            self._sync()
+            self._append({'op': 'add', 'repo_url': repo_url, 'post_info': post_info})
+
+    def remove(self, repo_urls: Iterable[str]) -> None:
+        """Forget posted repositories (one journal line)."""
+        with file_lock(self.history_file):
+            self._sync()
+            self._append({'op': 'remove', 'repo_urls': list(repo_urls)})
+
+    def _is_live(self, epoch: int, repo_url: str) -> bool:
+        """True when a heap entry still describes the current post of the repository."""
+        post_info = self.last_posts.get(repo_url)
+        return post_info is not None and post_info.get('posted_at_epoch') == epoch
+
+    def expired(self, cutoff: int) -> List[str]:
+        """
+        Repositories posted before ``cutoff``, popped from the expiry heap.
+
+        Args:
+            cutoff: Unix timestamp
+
+        Returns:
+            Repo URLs to remove
+        """
+        with file_lock(self.history_file):
+            self._sync()
+        expired = []
+        while self.expiry and self.expiry[0][0] < cutoff:
+            epoch, repo_url = heapq.heappop(self.expiry)
+            if self._is_live(epoch, repo_url):
+                expired.append(repo_url)
+        return expired
+
+
+class SqliteHistoryStore:
+    """SQLite storage in WAL mode with single-row writes.
+
+    The repo URL is the primary key and the posting time is stored as an
+    indexed epoch column, so pruning is one range query. Analytics metadata
+    (language, source, channel, stage durations) is kept as JSON. Lookups
+    are served from the in-memory set loaded at startup; only changed rows
+    are written. An existing ``posted_repos.json`` is imported into an empty
+    database and left in place as a backup; a marker row written in the
+    same transaction makes the import happen exactly once.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS posted_repos (
+            repo_url TEXT PRIMARY KEY,
+            tweet_id TEXT,
+            posted_at TEXT,
+            posted_at_epoch INTEGER,
+            metadata TEXT
+        );
+        CREATE TABLE IF NOT EXISTS history_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_posted_repos_posted_at_epoch ON posted_repos (posted_at_epoch);
+    """
+    
+    # history_meta key set once the JSON history has been imported
+    MIGRATED_KEY = 'json_migrated'
+    
+    # Columns stored as such, the rest of a history entry goes to ``metadata``
+    COLUMNS = ('tweet_id', 'posted_at', 'posted_at_epoch')
+    
+    UPSERT = (
+        "INSERT OR REPLACE INTO posted_repos (repo_url, tweet_id, posted_at, posted_at_epoch, metadata) "
+        "VALUES (?, ?, ?, ?, ?)"
+    )
+
+    def __init__(self, db_file: Path, legacy_json_file: Path):
+        self.db_file = db_file
+        self.legacy_json_file = legacy_json_file
+        self.posted_repos: Set[str] = set()
+        self.last_posts: Dict[str, Dict[str, Any]] = {}
+        self.conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.db_file), timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def load(self) -> None:
+        """Open (creating and importing the JSON history if needed) the database and load the history."""
+        self.conn = self._connect()
+        with self.conn:
+            self.conn.executescript(self.SCHEMA)
+        self._migrate_json()
+
+        self.posted_repos = set()
+        self.last_posts = {}
+        for repo_url, tweet_id, posted_at, epoch, metadata in self.conn.execute(
+            "SELECT repo_url, tweet_id, posted_at, posted_at_epoch, metadata FROM posted_repos"
+        ):
+            self.posted_repos.add(repo_url)
+            if posted_at is not None:
+                self.last_posts[repo_url] = {
+                    'tweet_id': tweet_id, 'posted_at': posted_at, 'posted_at_epoch': epoch,
+                    **(json.loads(metadata) if metadata else {})
+                }
+
+    def _row(self, repo_url: str, post_info: Dict[str, Any]) -> Tuple[Any, ...]:
+        metadata = {key: value for key, value in post_info.items() if key not in self.COLUMNS}
+        return (
+            repo_url, post_info.get('tweet_id'), post_info.get('posted_at'), posted_epoch(post_info),
+            json.dumps(metadata, ensure_ascii=False) if metadata else None
+        )
+
+    def _migrate_json(self) -> None:
+        """
+        Import the JSON history into an empty database, once.
+
+        The import and its marker row are committed together: an import that
+        failed (history file locked, unreadable) is retried on the next run.
+        """
+        if self.conn.execute("SELECT 1 FROM history_meta WHERE key = ?", (self.MIGRATED_KEY,)).fetchone():
+            return
+        rows = []
+        if self.legacy_json_file.exists():
+            legacy = JsonHistoryStore(self.legacy_json_file)
+            legacy.load()
+            for repo_url in legacy.posted_repos | set(legacy.last_posts):
+                info = legacy.last_posts.get(repo_url)
+                rows.append(self._row(repo_url, info) if info else (repo_url, None, None, None, None))
+        with self.conn:
+            self.conn.executemany(self.UPSERT, rows)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO history_meta (key, value) VALUES (?, ?)",
+                (self.MIGRATED_KEY, str(int(time.time())))
+            )
+        if not rows:
+            return
+        logger.info(
+            "History migrated from JSON to SQLite",
+            **log_step("history_migrated", count=len(rows), source=str(self.legacy_json_file))
+        )
+
+    def add(self, repo_url: str, post_info: Dict[str, Any]) -> None:
+        """Record a posted repository (one row upsert)."""
+        with self.conn:
+            self.conn.execute(self.UPSERT, self._row(repo_url, post_info))
+        self.posted_repos.add(repo_url)
+        self.last_posts[repo_url] = post_info
+
+    def remove(self, repo_urls: Iterable[str]) -> None:
+        """Forget posted repositories."""
+        repo_urls = list(repo_urls)
+        with self.conn:
+            self.conn.executemany("DELETE FROM posted_repos WHERE repo_url = ?", [(url,) for url in repo_urls])
+        for repo_url in repo_urls:
+            self.posted_repos.discard(repo_url)
+            self.last_posts.pop(repo_url, None)
+
+    def expired(self, cutoff: int) -> List[str]:
+        """
+        Repositories posted before ``cutoff`` (range scan on the epoch index).
+
+        Args:
+            cutoff: Unix timestamp
+
+        Returns:
+            Repo URLs to remove
+        """
+        return [row[0] for row in self.conn.execute(
+            "SELECT repo_url FROM posted_repos WHERE posted_at_epoch < ?", (cutoff,)
+        )]
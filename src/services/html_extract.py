@@ -0,0 +1,201 @@
+"""Fast row extraction for the GitHub Trending and Gitstar scrapers."""
+import re
+from typing import Dict, Iterator, List, Optional
+
+from bs4 import BeautifulSoup
+
+from ..core.config import settings
+from ..core.logger import logger, log_step
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser as SelectolaxParser  # selectolax < 1.0
+    except ImportError:
+        SelectolaxParser = None
+
+try:
+    import lxml.html as lxml_html
+except ImportError:
+    lxml_html = None
+
+
+# Only these regions are parsed, the rest of the page is never tokenized
+TRENDING_ROW_RE = re.compile(
+    r'<article\b[^>]*class="[^"]*\bBox-row\b[^"]*"[^>]*>.*?</article>',
+    re.DOTALL | re.IGNORECASE
+)
+TBODY_RE = re.compile(r'<tbody\b[^>]*>(.*?)</tbody>', re.DOTALL | re.IGNORECASE)
+TABLE_ROW_RE = re.compile(r'<tr\b[^>]*>.*?</tr>', re.DOTALL | re.IGNORECASE)
+
+STARGAZERS_XPATH = (
+    ".//a[substring(@href, string-length(@href) - string-length('/stargazers') + 1) = '/stargazers']"
+)
+
+
+def available_backends() -> List[str]:
+    """Parser backends usable in this environment, fastest first."""
+    backends = []
+    if SelectolaxParser is not None:
+        backends.append("selectolax")
+    if lxml_html is not None:
+        backends.append("lxml")
+    backends.append("bs4")
+    return backends
+
+
+class RowExtractor:
+    """Extract repository rows from scraped pages with a pluggable parser backend.
+
+    Rows are located with a regular expression and only those fragments are
+    handed to the parser (selectolax, lxml or BeautifulSoup), instead of
+    building a tree for the whole page.
+    """
+
+    def __init__(self, backend: Optional[str] = None):
+        backend = backend or settings.html_parser_backend
+        backends = available_backends()
+        if backend == "auto":
+            backend = backends[0]
+        elif backend not in backends:
+            logger.warning(
+                f"HTML parser backend {backend} not available, using {backends[0]}",
+                **log_step("html_backend_unavailable", backend=backend)
+            )
+            backend = backends[0]
+        self.backend = backend
+
+    @staticmethod
+    def _text(value: Optional[str]) -> str:
+        return " ".join(value.split()) if value else ""
+
+    def trending_rows(self, html: str, limit: int) -> List[Dict[str, str]]:
+        """
+        Extract rows of the GitHub Trending page.
+
+        Args:
+            html: Page HTML
+            limit: Maximum number of rows to parse
+
+        Returns:
+            Raw row fields: href, description, language, stars
+        """
+        rows = []
+        for match in self._limited(TRENDING_ROW_RE.finditer(html), limit):
+            row = getattr(self, f"_trending_row_{self.backend}")(match.group(0))
+            if row:
+                rows.append(row)
+        return rows
+
+    def gitstar_rows(self, html: str, limit: int) -> List[Dict[str, str]]:
+        """
+        Extract rows of the Gitstar ranking table.
+
+        Args:
+            html: Page HTML
+            limit: Maximum number of rows to parse
+
+        Returns:
+            Raw row fields: href, name, stars
+        """
+        body = TBODY_RE.search(html)
+        if not body:
+            return []
+        rows = []
+        for match in self._limited(TABLE_ROW_RE.finditer(body.group(1)), limit):
+            row = getattr(self, f"_gitstar_row_{self.backend}")(f"<table><tbody>{match.group(0)}</tbody></table>")
+            if row:
+                rows.append(row)
+        return rows
+
+    @staticmethod
+    def _limited(matches: Iterator[re.Match], limit: int) -> Iterator[re.Match]:
+        for index, match in enumerate(matches):
+            if index >= limit:
+                return
+            yield match
+
+    # selectolax backend
+
+    def _trending_row_selectolax(self, fragment: str) -> Optional[Dict[str, str]]:
+        tree = SelectolaxParser(fragment)
+        link = tree.css_first("h2 a")
+        if link is None or not link.attributes.get("href"):
+            return None
+        desc = tree.css_first("p")
+        lang = tree.css_first("span[itemprop='programmingLanguage']")
+        stars = tree.css_first("a[href$='/stargazers']")
+        return {
+            "href": link.attributes["href"],
+            "description": self._text(desc.text()) if desc else "",
+            "language": self._text(lang.text()) if lang else "",
+            "stars": self._text(stars.text()) if stars else ""
+        }
+
+    def _gitstar_row_selectolax(self, fragment: str) -> Optional[Dict[str, str]]:
+        cells = SelectolaxParser(fragment).css("td")
+        link = cells[1].css_first("a") if len(cells) > 1 else None
+        if link is None or not link.attributes.get("href"):
+            return None
+        return {
+            "href": link.attributes["href"],
+            "name": self._text(link.text()),
+            "stars": self._text(cells[2].text()) if len(cells) > 2 else ""
+        }
+
+    # lxml backend
+
+    def _trending_row_lxml(self, fragment: str) -> Optional[Dict[str, str]]:
+        tree = lxml_html.fragment_fromstring(fragment)
+        links = tree.xpath(".//h2//a[@href]")
+        if not links:
+            return None
+        desc = tree.xpath(".//p")
+        lang = tree.xpath(".//span[@itemprop='programmingLanguage']")
+        stars = tree.xpath(STARGAZERS_XPATH)
+        return {
+            "href": links[0].get("href"),
+            "description": self._text(desc[0].text_content()) if desc else "",
+            "language": self._text(lang[0].text_content()) if lang else "",
+            "stars": self._text(stars[0].text_content()) if stars else ""
+        }
+
+    def _gitstar_row_lxml(self, fragment: str) -> Optional[Dict[str, str]]:
+        cells = lxml_html.fragment_fromstring(fragment).xpath(".//td")
+        links = cells[1].xpath(".//a[@href]") if len(cells) > 1 else []
+        if not links:
+            return None
+        return {
+            "href": links[0].get("href"),
+            "name": self._text(links[0].text_content()),
+            "stars": self._text(cells[2].text_content()) if len(cells) > 2 else ""
+        }
+
+    # BeautifulSoup backend
+
+    def _trending_row_bs4(self, fragment: str) -> Optional[Dict[str, str]]:
+        soup = BeautifulSoup(fragment, 'html.parser')
+        link = soup.select_one("h2 a")
+        if not link or not link.get('href'):
+            return None
+        desc = soup.select_one("p")
+        lang = soup.select_one("span[itemprop='programmingLanguage']")
+        stars = soup.select_one("a[href$='/stargazers']")
+        return {
+            "href": link['href'],
+            "description": self._text(desc.text) if desc else "",
+            "language": self._text(lang.text) if lang else "",
+            "stars": self._text(stars.text) if stars else ""
+        }
+
+    def _gitstar_row_bs4(self, fragment: str) -> Optional[Dict[str, str]]:
+        cells = BeautifulSoup(fragment, 'html.parser').select("td")
+        link = cells[1].select_one("a") if len(cells) > 1 else None
+        if not link or not link.get('href'):
+            return None
+        return {
+            "href": link['href'],
+            "name": self._text(link.text),
+            "stars": self._text(cells[2].text) if len(cells) > 2 else ""
+        }
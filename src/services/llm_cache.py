@@ -0,0 +1,112 @@
+"""Persistent cache of LLM answers, keyed by the content of the request."""
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from ..core.config import settings
+from ..core.logger import logger, log_step
+from ..core.storage import atomic_write_json
+
+
+class LlmResponseCache:
+    """Content-addressed LLM response cache with TTL and LRU eviction.
+
+    The key is a SHA-256 of the prompt, provider, model and generation
+    options, so an identical request made by a later run (after a failed
+    screenshot or post, or for the same tweet text) reuses the answer.
+    Entries expire after ``llm_cache_ttl_hours`` and the least recently
+    used ones are evicted beyond ``llm_cache_max_entries``. Stored in
+    ``data/llm_cache.json`` with cumulative hit / miss counters.
+    """
+
+    def __init__(
+        self,
+        cache_file: Optional[str] = None,
+        max_entries: Optional[int] = None,
+        ttl_hours: Optional[float] = None
+    ):
+        self.cache_file = Path(cache_file) if cache_file else Path(settings.data_dir) / "llm_cache.json"
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries or settings.llm_cache_max_entries
+        self.ttl = (ttl_hours if ttl_hours is not None else settings.llm_cache_ttl_hours) * 3600
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self) -> None:
+        self.entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.totals = {'hits': 0, 'misses': 0}
+        try:
+            if self.cache_file.exists():
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self.entries = OrderedDict(data.get('entries', []))
+                self.totals.update(data.get('totals', {}))
+        except Exception as e:
+            logger.warning("Failed to load LLM cache", **log_step("llm_cache_error", error=str(e)))
+
+    def _save(self) -> None:
+        try:
+            atomic_write_json(
+                self.cache_file,
+                {'entries': list(self.entries.items()), 'totals': self.totals},
+                ensure_ascii=False
+            )
+        except Exception as e:
+            logger.warning("Failed to save LLM cache", **log_step("llm_cache_error", error=str(e)))
+
+    @staticmethod
+    def key(prompt: str, provider: str, model: str, options: Dict[str, Any]) -> str:
+        """Hash of everything that determines the answer."""
+        payload = json.dumps(
+            {'prompt': prompt, 'provider': provider, 'model': model, 'options': options},
+            sort_keys=True, ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached answer, or None when absent or expired (does not count as a lookup)."""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry['created_at'] > self.ttl:
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return entry['text']
+
+    def put(self, key: str, text: str) -> None:
+        """Store an answer, evicting expired then least recently used entries."""
+        now = time.time()
+        self.entries[key] = {'text': text, 'created_at': now}
+        self.entries.move_to_end(key)
+        for stale in [k for k, entry in self.entries.items() if now - entry['created_at'] > self.ttl]:
+            del self.entries[stale]
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        self._save()
+
+    def record_lookup(self, task: str, hit: bool, provider: Optional[str] = None) -> None:
+        """Count one lookup and log the hit rates of this run and of all runs."""
+        if hit:
+            self.hits += 1
+            self.totals['hits'] += 1
+            self._save()  # Persist the LRU position and the counters
+        else:
+            self.misses += 1
+            self.totals['misses'] += 1
+        total = self.totals['hits'] + self.totals['misses']
+        logger.info(
+            f"LLM cache {'hit' if hit else 'miss'} for {task}",
+            **log_step(
+                "ai_cache_hit" if hit else "ai_cache_miss",
+                task=task,
+                provider=provider,
+                hit_rate=round(self.hits / (self.hits + self.misses), 3),
+                total_hit_rate=round(self.totals['hits'] / total, 3),
+                entries=len(self.entries)
+            )
+        )
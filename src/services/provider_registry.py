@@ -0,0 +1,187 @@
+"""Registry of the configured AI providers with persisted call statistics."""
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..core.config import settings
+from ..core.health_score import append_call, health_score, recent_calls, success_rate
+from ..core.logger import logger, log_step
+from ..core.storage import atomic_write_json
+
+
+Provider = Tuple[str, Callable[..., str]]
+
+
+class ProviderQuotaError(Exception):
+    """Provider refused the call because a rate limit or quota is exhausted (HTTP 429)."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ProviderRegistry:
+    """Configured providers, ordered per task from their rolling statistics.
+
+    Providers without credentials are dropped at construction. Every call
+    is recorded per provider and task (success, latency, time) in
+    ``data/ai_provider_stats.json``; calls older than
+    ``ai_provider_stats_max_age_hours`` are ignored, so a demoted provider
+    gets its place back. A provider that hit its quota is skipped until the
+    quota cooldown (or the Retry-After delay) has passed.
+    """
+
+    def __init__(
+        self,
+        providers: List[Tuple[str, Callable[..., str], bool]],
+        stats_file: Optional[str] = None,
+        window: Optional[int] = None,
+        max_age_hours: Optional[float] = None
+    ):
+        """
+        Args:
+            providers: (name, request function, configured) in order of preference
+            stats_file: Persisted statistics (default ``data/ai_provider_stats.json``)
+            window: Calls kept per provider and task
+            max_age_hours: Calls older than this are ignored by scoring
+        """
+        self.stats_file = Path(stats_file) if stats_file else Path(settings.data_dir) / "ai_provider_stats.json"
+        self.stats_file.parent.mkdir(parents=True, exist_ok=True)
+        self.window = window or settings.ai_latency_window
+        self.max_age_seconds = (max_age_hours or settings.ai_provider_stats_max_age_hours) * 3600
+        self.providers: List[Provider] = [(name, func) for name, func, configured in providers if configured]
+        self.last_latencies: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+        dropped = [name for name, _, configured in providers if not configured]
+        logger.info(
+            "AI providers ready",
+            **log_step("ai_providers_ready", providers=[name for name, _ in self.providers], dropped=dropped)
+        )
+
+    def _load(self) -> None:
+        """Load persisted statistics."""
+        try:
+            if self.stats_file.exists():
+                with open(self.stats_file, 'r', encoding='utf-8') as f:
+                    self.stats: Dict[str, Dict[str, Any]] = json.load(f)
+            else:
+                self.stats = {}
+        except Exception as e:
+            logger.warning(
+                "Failed to load AI provider stats, starting fresh",
+                **log_step("ai_provider_stats_load_error", error=str(e))
+            )
+            self.stats = {}
+
+    def _save(self) -> None:
+        """Persist statistics (lock held)."""
+        try:
+            atomic_write_json(self.stats_file, self.stats, indent=2)
+        except Exception as e:
+            logger.warning(
+                "Failed to save AI provider stats",
+                **log_step("ai_provider_stats_save_error", error=str(e))
+            )
+
+    def _provider(self, name: str) -> Dict[str, Any]:
+        return self.stats.setdefault(name, {'calls': {}, 'quota_until': 0, 'quota_hits': 0})
+
+    def record(self, name: str, task: str, ok: bool, latency: float) -> None:
+        """Record one provider call."""
+        with self._lock:
+            calls = self._provider(name)['calls']
+            calls[task] = append_call(calls.get(task, []), ok, latency, self.window)
+            self.last_latencies[name] = round(latency, 3)
+            self._save()
+
+    def record_quota(self, name: str, retry_after: Optional[float] = None) -> None:
+        """Skip a provider until its quota is expected to be available again."""
+        cooldown = retry_after if retry_after else settings.ai_quota_cooldown_minutes * 60
+        with self._lock:
+            provider = self._provider(name)
+            provider['quota_until'] = int(time.time() + cooldown)
+            provider['quota_hits'] += 1
+            self._save()
+        logger.warning(
+            f"{name} quota exhausted",
+            **log_step("ai_provider_quota", provider=name, cooldown_minutes=round(cooldown / 60, 1))
+        )
+
+    def _history(self, name: str, task: Optional[str] = None) -> List[List[float]]:
+        """Recent calls of a provider for a task, or for all its tasks."""
+        with self._lock:
+            calls = self.stats.get(name, {}).get('calls', {})
+            if task is not None:
+                history = list(calls.get(task, []))
+            else:
+                history = [call for task_calls in calls.values() for call in task_calls]
+        return recent_calls(history, self.max_age_seconds)
+
+    def _task_history(self, name: str, task: str) -> List[List[float]]:
+        # A task the provider never served is scored on its other tasks
+        return self._history(name, task) or self._history(name)
+
+    def success_rate(self, name: str, task: str) -> float:
+        """Rolling success rate, smoothed by ``health_score.PRIOR_SUCCESSES``."""
+        return success_rate(self._task_history(name, task))
+
+    def score(self, name: str, task: str) -> float:
+        """Score in [0, 1]: success rate weighted by the median latency."""
+        return health_score(self._task_history(name, task))
+
+    def available(self, name: str) -> bool:
+        """False while the provider is in quota cooldown."""
+        with self._lock:
+            return self.stats.get(name, {}).get('quota_until', 0) <= time.time()
+
+    def order(self, task: str) -> List[Provider]:
+        """
+        Providers to call for a task, best first.
+
+        Providers in quota cooldown are skipped, unless all of them are.
+        Equal scores (rounded to 0.1) keep the order of preference.
+
+        Args:
+            task: Task name (summary, features, validation...)
+
+        Returns:
+            (name, request function) list
+        """
+        ordered = [provider for provider in self.providers if self.available(provider[0])] or list(self.providers)
+        ordered.sort(key=lambda provider: -round(self.score(provider[0], task), 1))
+        names = [name for name, _ in ordered]
+        if names != [name for name, _ in self.providers]:
+            logger.info(
+                f"AI providers reordered for {task}",
+                **log_step("ai_provider_order", task=task, order=names)
+            )
+        return ordered
+
+    def attempts(self, name: str, task: str, default: int) -> int:
+        """
+        Retry budget of a provider for a task.
+
+        Reliable providers keep ``default`` attempts; retrying a provider that
+        mostly fails only delays the next one.
+        """
+        success_rate = self.success_rate(name, task)
+        if success_rate >= 0.8:
+            return default
+        if success_rate >= 0.5:
+            return min(default, 2)
+        return 1
+
+    def latency_percentiles(self) -> Dict[str, Dict[str, float]]:
+        """p50 / p90 / p99 call latency (seconds) per provider over the rolling window."""
+        percentiles = {}
+        for name, _ in self.providers:
+            values = sorted(latency for _, latency, _ in self._history(name))
+            if values:
+                percentiles[name] = {
+                    f"p{q}": values[min(len(values) - 1, len(values) * q // 100)] for q in (50, 90, 99)
+                }
+        return percentiles
@@ -0,0 +1,218 @@
+"""Markdown-aware README distillation before prompting."""
+import hashlib
+import json
+import re
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ..core.config import settings
+from ..core.logger import logger, log_step
+from ..core.storage import atomic_write_json, file_lock
+
+
+# Blocks removed before sentence extraction
+FENCED_CODE_RE = re.compile(r'^(```|~~~).*?^\1[^\n]*$', re.DOTALL | re.MULTILINE)
+HTML_COMMENT_RE = re.compile(r'<!--.*?-->', re.DOTALL)
+HTML_TAG_RE = re.compile(r'<[^>]+>')
+IMAGE_RE = re.compile(r'!\[[^\]]*\]\([^)]*\)|!\[[^\]]*\]\[[^\]]*\]')
+LINK_RE = re.compile(r'\[([^\]]*)\]\([^)]*\)|\[([^\]]*)\]\[[^\]]*\]')
+REFERENCE_DEF_RE = re.compile(r'^\s*\[[^\]]+\]:\s*\S+.*$', re.MULTILINE)
+URL_RE = re.compile(r'https?://\S+')
+TABLE_ROW_RE = re.compile(r'^\s*\|.*\|\s*$', re.MULTILINE)
+HEADING_RE = re.compile(r'^\s{0,3}#{1,6}\s*(.*?)\s*#*\s*$')
+TOC_HEADING_RE = re.compile(r'table of contents|contents|toc|sommaire|table des matières', re.IGNORECASE)
+LIST_ITEM_RE = re.compile(r'^\s*(?:[-*+]|\d+[.)])\s+')
+SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+(?=[A-Z0-9À-Ý"«(])')
+WORD_RE = re.compile(r"[a-zA-ZÀ-ÿ][a-zA-ZÀ-ÿ'-]+")
+
+# Words carrying no meaning for salience scoring
+STOPWORDS = frozenset("""
+a an and are as at be been but by can do does for from has have how if in into is it its
+just more most not of on or our so such than that the their them then there these they this
+to use used using via was we were what when which will with you your yours also all any
+le la les un une des du de et en est pour par sur dans avec qui que ce cette ces vous nous
+""".split())
+
+# Sections usually made of setup instructions rather than a description
+SKIPPED_SECTIONS_RE = re.compile(
+    r'install|installation|getting started|quick ?start|usage|build|license|licence|contribut|'
+    r'changelog|faq|acknowledg|sponsor|citation|support|requirements|development|setup',
+    re.IGNORECASE
+)
+
+
+class ReadmeDistiller:
+    """Reduce a README to its most informative intro sentences.
+
+    Badges, images, HTML, code fences, tables, link targets and tables of
+    contents are stripped, then sentences are ranked by salience (frequency
+    of their content words in the README, position and length) and the best
+    ones are kept in document order within a character budget. Results are
+    cached on disk by README hash; new entries are written by ``flush``,
+    merged under a file lock with those of other processes.
+    """
+
+    def __init__(self, cache_file: Optional[str] = None, max_entries: Optional[int] = None):
+        self.cache_file = Path(cache_file) if cache_file else Path(settings.data_dir) / "readme_distill_cache.json"
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries or settings.readme_distill_cache_entries
+        # Entries distilled since the last flush
+        self._pending: Dict[str, str] = {}
+        self.cache = self._read_cache()
+
+    def _read_cache(self) -> "OrderedDict[str, str]":
+        try:
+            if self.cache_file.exists():
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    return OrderedDict(json.load(f))
+        except Exception as e:
+            logger.warning(
+                "Failed to load README distillation cache",
+                **log_step("readme_distill_cache_error", error=str(e))
+            )
+        return OrderedDict()
+
+    def flush(self) -> None:
+        """Merge the new entries into the cache file (one write per run, not per README)."""
+        if not self._pending:
+            return
+        try:
+            with file_lock(self.cache_file):
+                # Another process may have saved entries since this one loaded the file
+                cache = self._read_cache()
+                for key, distilled in self._pending.items():
+                    cache[key] = distilled
+                    cache.move_to_end(key)
+                while len(cache) > self.max_entries:
+                    cache.popitem(last=False)
+                atomic_write_json(self.cache_file, list(cache.items()), ensure_ascii=False)
+            self.cache = cache
+            self._pending.clear()
+        except Exception as e:
+            logger.warning(
+                "Failed to save README distillation cache",
+                **log_step("readme_distill_cache_error", error=str(e))
+            )
+
+    def distill(self, readme: str, max_chars: Optional[int] = None) -> str:
+        """
+        Distill a README for prompting.
+
+        Args:
+            readme: Raw README (Markdown, HTML or plain text)
+            max_chars: Character budget (defaults to settings)
+
+        Returns:
+            Most salient sentences in document order, or the raw README start
+            when nothing usable is left after cleaning
+        """
+        max_chars = max_chars or settings.readme_distill_max_chars
+        key = hashlib.sha256(f"{max_chars}|{readme}".encode("utf-8")).hexdigest()
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            return self.cache[key]
+
+        sentences = self._sentences(self._clean(readme))
+        distilled = self._select(sentences, max_chars) or readme[:max_chars]
+
+        self.cache[key] = distilled
+        self._pending[key] = distilled
+        while len(self.cache) > self.max_entries:
+            self.cache.popitem(last=False)
+
+        logger.info(
+            "README distilled",
+            **log_step("readme_distilled", raw_length=len(readme), distilled_length=len(distilled),
+                       sentences=len(sentences))
+        )
+        return distilled
+
+    def _clean(self, readme: str) -> List[str]:
+        """Strip non-prose Markdown/HTML and return cleaned paragraphs."""
+        text = FENCED_CODE_RE.sub('\n', readme)
+        text = HTML_COMMENT_RE.sub('', text)
+        text = IMAGE_RE.sub('', text)
+        text = LINK_RE.sub(lambda m: m.group(1) or m.group(2) or '', text)
+        text = REFERENCE_DEF_RE.sub('', text)
+        text = HTML_TAG_RE.sub(' ', text)
+        text = TABLE_ROW_RE.sub('', text)
+        text = URL_RE.sub('', text)
+
+        paragraphs = []
+        current: List[str] = []
+        skipping = False
+        in_toc = False
+        for line in text.splitlines():
+            heading = HEADING_RE.match(line)
+            if heading or not line.strip():
+                if current:
+                    paragraphs.append(" ".join(current))
+                    current = []
+                if heading:
+                    title = heading.group(1).strip()
+                    in_toc = bool(TOC_HEADING_RE.fullmatch(title))
+                    skipping = not in_toc and bool(SKIPPED_SECTIONS_RE.search(title))
+                continue
+            if skipping:
+                continue
+            is_list_item = bool(LIST_ITEM_RE.match(line))
+            # A table of contents is a list; prose after it is not part of it
+            if in_toc:
+                if is_list_item:
+                    continue
+                in_toc = False
+            line = LIST_ITEM_RE.sub('', line).strip()
+            line = re.sub(r'[*_`>#]+', '', line).strip()
+            # Lines without words (separators, badge leftovers, emoji rows)
+            if len(WORD_RE.findall(line)) < 2:
+                continue
+            if is_list_item:
+                # Feature lists: each item is a sentence of its own
+                if current:
+                    paragraphs.append(" ".join(current))
+                    current = []
+                paragraphs.append(line if line[-1] in ".!?" else line + ".")
+                continue
+            current.append(line)
+        if current:
+            paragraphs.append(" ".join(current))
+        return paragraphs
+
+    def _sentences(self, paragraphs: List[str]) -> List[str]:
+        sentences = []
+        for paragraph in paragraphs:
+            for sentence in SENTENCE_SPLIT_RE.split(paragraph):
+                sentence = " ".join(sentence.split())
+                if len(WORD_RE.findall(sentence)) >= 4:
+                    sentences.append(sentence)
+        return sentences
+
+    def _select(self, sentences: List[str], max_chars: int) -> str:
+        """Keep the most salient sentences, in document order, within the budget."""
+        if not sentences:
+            return ""
+        words_per_sentence = [
+            [w.lower() for w in WORD_RE.findall(s) if w.lower() not in STOPWORDS] for s in sentences
+        ]
+        frequencies = Counter(w for words in words_per_sentence for w in set(words))
+
+        scores = []
+        for index, words in enumerate(words_per_sentence):
+            if not words:
+                scores.append(0.0)
+                continue
+            salience = sum(frequencies[w] for w in set(words)) / len(set(words))
+            position = 1.0 / (1 + index / 3)  # Intro sentences describe the project
+            length = min(len(words), 25) / 25  # Favor informative, not tiny, sentences
+            scores.append(salience * (0.5 + position) * (0.5 + length))
+
+        chosen = []
+        used = 0
+        for index in sorted(range(len(sentences)), key=lambda i: -scores[i]):
+            cost = len(sentences[index]) + 1
+            if used + cost > max_chars:
+                continue
+            chosen.append(index)
+            used += cost
+        return " ".join(sentences[i] for i in sorted(chosen))
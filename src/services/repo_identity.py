@@ -0,0 +1,144 @@
+"""Canonical repository identity shared by every trending source."""
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Union
+
+from ..core.config import settings
+from ..core.logger import logger, log_step
+from ..core.storage import atomic_write_json
+
+
+GITHUB_PREFIX_RE = re.compile(r'^(?:https?://)?(?:www\.)?github\.com/', re.IGNORECASE)
+
+
+def canonical_repo_key(value: Optional[str]) -> Optional[str]:
+    """
+    Normalize a repository URL or full name to a case-folded ``owner/repo``.
+
+    ``https://github.com/Owner/Repo/``, ``github.com/owner/repo.git`` and
+    ``Owner/Repo`` all give ``owner/repo``; sub-paths (``/tree/main``) and
+    query strings are dropped.
+
+    Args:
+        value: Repository URL or full name
+
+    Returns:
+        Canonical key, or None when the value does not name a repository
+    """
+    if not value:
+        return None
+    path = GITHUB_PREFIX_RE.sub('', value.strip()).split('?')[0].split('#')[0]
+    parts = [part for part in path.split('/') if part]
+    if len(parts) < 2:
+        return None
+    owner, name = parts[0], parts[1]
+    if name.endswith('.git'):
+        name = name[:-4]
+    return f"{owner}/{name}".casefold()
+
+
+class RepoIdentityIndex:
+    """Map every name a repository was seen under to one canonical key.
+
+    GitHub repository IDs survive renames and transfers: when a known ID
+    shows up under another name (or GraphQL resolves a redirect), the new
+    name becomes an alias of the key first seen for that ID. Lookups are
+    dict accesses; the index is persisted in ``data/repo_identity.json``.
+    """
+
+    # Bound on alias chains, protects against cycles in a corrupted file
+    MAX_ALIAS_HOPS = 10
+
+    def __init__(self, index_file: Optional[str] = None):
+        self.index_file = Path(index_file) if index_file else Path(settings.data_dir) / "repo_identity.json"
+        self.index_file.parent.mkdir(parents=True, exist_ok=True)
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            if self.index_file.exists():
+                with open(self.index_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self.ids: Dict[str, str] = data.get('ids', {})
+                self.aliases: Dict[str, str] = data.get('aliases', {})
+            else:
+                self.ids, self.aliases = {}, {}
+        except Exception as e:
+            logger.warning(
+                "Failed to load repository identity index, starting fresh",
+                **log_step("repo_identity_load_error", error=str(e))
+            )
+            self.ids, self.aliases = {}, {}
+
+    def _save(self) -> None:
+        try:
+            atomic_write_json(self.index_file, {'ids': self.ids, 'aliases': self.aliases})
+        except Exception as e:
+            logger.warning(
+                "Failed to save repository identity index",
+                **log_step("repo_identity_save_error", error=str(e))
+            )
+
+    def resolve(self, key: Optional[str]) -> Optional[str]:
+        """Follow aliases from a canonical key to the repository identity."""
+        for _ in range(self.MAX_ALIAS_HOPS):
+            if key not in self.aliases:
+                break
+            key = self.aliases[key]
+        return key
+
+    def key(self, repo: Union[str, Dict[str, Any]]) -> Optional[str]:
+        """Identity key of a repository given as URL, full name or repository dict."""
+        if isinstance(repo, dict):
+            repo_id = repo.get('id')
+            if repo_id is not None and str(repo_id) in self.ids:
+                return self.resolve(self.ids[str(repo_id)])
+            return self.resolve(canonical_repo_key(repo.get('full_name') or repo.get('html_url')))
+        return self.resolve(canonical_repo_key(repo))
+
+    def observe(self, repos: Iterable[Dict[str, Any]]) -> int:
+        """
+        Learn repository IDs and renames from fetched repositories.
+
+        Args:
+            repos: Repositories, with ``id`` when the source provides it and
+                ``name_with_owner`` when GraphQL resolved the current name
+
+        Returns:
+            Number of new aliases
+        """
+        new_aliases = 0
+        changed = False
+        for repo in repos:
+            names = {
+                canonical_repo_key(repo.get(field))
+                for field in ('full_name', 'html_url', 'name_with_owner')
+            } - {None}
+            if not names:
+                continue
+            repo_id = repo.get('id')
+            if repo_id is not None:
+                repo_id = str(repo_id)
+                if repo_id not in self.ids:
+                    self.ids[repo_id] = canonical_repo_key(repo.get('name_with_owner')) or min(names)
+                    changed = True
+                identity = self.resolve(self.ids[repo_id])
+            elif len(names) > 1 and repo.get('name_with_owner'):
+                identity = self.resolve(canonical_repo_key(repo.get('name_with_owner')))
+            else:
+                continue
+            for name in names:
+                if name != identity and self.resolve(name) != identity:
+                    self.aliases[name] = identity
+                    new_aliases += 1
+                    changed = True
+
+        if changed:
+            self._save()
+        if new_aliases:
+            logger.info(
+                "Repository renames detected",
+                **log_step("repo_identity_aliases", new_aliases=new_aliases, tracked_ids=len(self.ids))
+            )
+        return new_aliases
@@ -0,0 +1,255 @@
+"""Star snapshots time-series to rank repositories by star velocity."""
+import json
+import time
+from array import array
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..core.config import settings
+from ..core.logger import logger, log_step
+from ..core.storage import atomic_write_json, file_lock
+from .repo_identity import canonical_repo_key
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class StarHistoryService:
+    """Compact time-series of star counts for every fetched repository.
+
+    Snapshots are appended to ``data/star_history/snapshots.bin`` as fixed
+    size records (repo index, unix timestamp, stars; three uint32). Star
+    velocity (stars/hour) and acceleration are computed for all tracked
+    repositories at once with NumPy when available, pure Python otherwise.
+    """
+
+    # Record layout: repo index, timestamp, stars
+    FIELDS = 3
+    TYPECODE = "I"
+
+    # Sources whose star count is a total (OSS Insight reports a per-period gain)
+    TOTAL_STAR_SOURCES = ("graphql", "github_api", "github_scrape", "gitstar")
+
+    def __init__(self, data_dir: Optional[str] = None):
+        self.history_dir = Path(data_dir) if data_dir else Path(settings.data_dir) / "star_history"
+        self.history_dir.mkdir(parents=True, exist_ok=True)
+        self.index_file = self.history_dir / "repos.json"
+        self.snapshots_file = self.history_dir / "snapshots.bin"
+        self._load()
+
+    def _load(self) -> None:
+        """Load repository index and snapshots."""
+        try:
+            if self.index_file.exists():
+                with open(self.index_file, 'r', encoding='utf-8') as f:
+                    self.keys: List[str] = json.load(f).get('repos', [])
+            else:
+                self.keys = []
+
+            self.records = array(self.TYPECODE)
+            if self.snapshots_file.exists():
+                with open(self.snapshots_file, 'rb') as f:
+                    self.records.frombytes(f.read())
+                # Drop a partially written trailing record
+                del self.records[len(self.records) - len(self.records) % self.FIELDS:]
+        except Exception as e:
+            logger.warning(
+                "Failed to load star history, starting fresh",
+                **log_step("star_history_load_error", error=str(e))
+            )
+            self.keys = []
+            self.records = array(self.TYPECODE)
+
+        self.key_index = {key: index for index, key in enumerate(self.keys)}
+        self._velocity_cache: Dict[float, Dict[str, Tuple[float, float]]] = {}
+
+    def _save_index(self) -> None:
+        atomic_write_json(self.index_file, {'repos': self.keys})
+
+    @staticmethod
+    def _key(repo: Dict[str, Any]) -> Optional[str]:
+        return canonical_repo_key(repo.get('full_name') or repo.get('html_url'))
+
+    @classmethod
+    def has_total_stars(cls, repo: Dict[str, Any]) -> bool:
+        """True when the repository's ``stargazers_count`` is a total star count."""
+        origin = repo.get('stargazers_source') or repo.get('source')
+        return bool(repo.get('stargazers_count')) and origin in cls.TOTAL_STAR_SOURCES
+
+    def size(self) -> int:
+        """Number of stored snapshots."""
+        return len(self.records) // self.FIELDS
+
+    def record(self, repos: List[Dict[str, Any]], timestamp: Optional[int] = None) -> int:
+        """
+        Append a star snapshot for each repository with a total star count.
+
+        Repositories whose ``stargazers_count`` comes from another source
+        (``stargazers_source``, else ``source``) are skipped.
+
+        Args:
+            repos: Repositories as fetched, or after GraphQL enrichment
+            timestamp: Snapshot time (defaults to now)
+
+        Returns:
+            Number of snapshots appended
+        """
+        timestamp = int(timestamp or time.time())
+        try:
+            # Repository indexes are shared by every process writing the history
+            with file_lock(self.index_file):
+                self._load()  # Repositories and snapshots added by other runs
+                new = array(self.TYPECODE)
+                seen = set()
+                new_keys = False
+                for repo in repos:
+                    key = self._key(repo)
+                    if not key or key in seen or not self.has_total_stars(repo):
+                        continue
+                    seen.add(key)
+                    if key not in self.key_index:
+                        self.key_index[key] = len(self.keys)
+                        self.keys.append(key)
+                        new_keys = True
+                    new.extend((self.key_index[key], timestamp, int(repo['stargazers_count'])))
+
+                if not new:
+                    return 0
+                if new_keys:
+                    self._save_index()
+                with open(self.snapshots_file, 'ab') as f:
+                    new.tofile(f)
+                self.records.extend(new)
+                self._velocity_cache.clear()
+
+                if self.size() > settings.star_history_max_snapshots:
+                    self.compact()
+        except Exception as e:
+            logger.error("Failed to save star snapshots", **log_step("star_history_save_error", error=str(e)))
+            return 0
+
+        count = len(new) // self.FIELDS
+        logger.info(
+            "Star snapshots recorded",
+            **log_step("star_history_recorded", count=count, tracked=len(self.keys), snapshots=self.size())
+        )
+        return count
+
+    def compact(self) -> None:
+        """Drop snapshots older than the retention period and rewrite the file (call with the file lock held)."""
+        cutoff = int(time.time()) - settings.star_history_retention_days * 86400
+        kept = array(self.TYPECODE)
+        for offset in range(0, len(self.records), self.FIELDS):
+            if self.records[offset + 1] >= cutoff:
+                kept.extend(self.records[offset:offset + self.FIELDS])
+        removed = self.size() - len(kept) // self.FIELDS
+        tmp_file = self.snapshots_file.with_suffix(".tmp")
+        with open(tmp_file, 'wb') as f:
+            kept.tofile(f)
+        tmp_file.replace(self.snapshots_file)
+        self.records = kept
+        self._velocity_cache.clear()
+        logger.info("Star history compacted", **log_step("star_history_compacted", removed=removed))
+
+    def velocities(self, window_hours: Optional[float] = None) -> Dict[str, Tuple[float, float]]:
+        """
+        Star velocity and acceleration of every tracked repository.
+
+        Velocity is the star gain per hour over the last window; acceleration
+        is the change of velocity between the previous window and the last
+        one, per hour. Repositories without two snapshots in the last window
+        are left out; acceleration is NaN without data in the previous window.
+
+        Args:
+            window_hours: Window size (defaults to settings)
+
+        Returns:
+            {full_name: (stars_per_hour, acceleration)}
+        """
+        window_hours = window_hours or settings.star_velocity_window_hours
+        if window_hours not in self._velocity_cache:
+            compute = self._velocities_numpy if np is not None else self._velocities_python
+            self._velocity_cache[window_hours] = compute(window_hours * 3600) if self.records else {}
+        return self._velocity_cache[window_hours]
+
+    def _velocities_numpy(self, window: float) -> Dict[str, Tuple[float, float]]:
+        data = np.frombuffer(self.records, dtype=np.uint32).reshape(-1, self.FIELDS).astype(np.int64)
+        repo, ts, stars = data[:, 0], data[:, 1], data[:, 2]
+        order = np.lexsort((ts, repo))
+        repo, ts, stars = repo[order], ts[order], stars[order]
+        now = ts.max()
+
+        def window_velocity(start: float, end: float) -> np.ndarray:
+            """Stars/hour per repo index between first and last snapshot in [start, end]."""
+            velocity = np.full(len(self.keys), np.nan)
+            mask = (ts >= start) & (ts <= end)
+            if not mask.any():
+                return velocity
+            w_repo, w_ts, w_stars = repo[mask], ts[mask], stars[mask]
+            ids, first = np.unique(w_repo, return_index=True)
+            last = np.append(first[1:], len(w_repo)) - 1
+            hours = (w_ts[last] - w_ts[first]) / 3600
+            with np.errstate(divide='ignore', invalid='ignore'):
+                velocity[ids] = np.where(hours > 0, (w_stars[last] - w_stars[first]) / hours, np.nan)
+            return velocity
+
+        current = window_velocity(now - window, now)
+        previous = window_velocity(now - 2 * window, now - window)
+        acceleration = (current - previous) / (window / 3600)
+        known = np.flatnonzero(~np.isnan(current))
+        return {self.keys[i]: (float(current[i]), float(acceleration[i])) for i in known}
+
+    def _velocities_python(self, window: float) -> Dict[str, Tuple[float, float]]:
+        series: Dict[int, List[Tuple[int, int]]] = {}
+        for offset in range(0, len(self.records), self.FIELDS):
+            index, ts, stars = self.records[offset:offset + self.FIELDS]
+            series.setdefault(index, []).append((ts, stars))
+        now = max(self.records[1::self.FIELDS])
+
+        def window_velocity(points: List[Tuple[int, int]], start: float, end: float) -> float:
+            inside = [p for p in points if start <= p[0] <= end]
+            if len(inside) < 2 or inside[-1][0] == inside[0][0]:
+                return float('nan')
+            return (inside[-1][1] - inside[0][1]) / ((inside[-1][0] - inside[0][0]) / 3600)
+
+        result = {}
+        for index, points in series.items():
+            points.sort()
+            current = window_velocity(points, now - window, now)
+            if current != current:  # NaN
+                continue
+            previous = window_velocity(points, now - 2 * window, now - window)
+            result[self.keys[index]] = (current, (current - previous) / (window / 3600))
+        return result
+
+    def rank(self, repos: List[Dict[str, Any]], window_hours: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Order repositories by star acceleration, then velocity.
+
+        Repositories without enough snapshots keep their relative order and
+        rank as neither accelerating nor decelerating. Velocity figures are
+        added to each repository as ``stars_per_hour`` / ``stars_acceleration``.
+
+        Args:
+            repos: Candidate repositories
+            window_hours: Window size (defaults to settings)
+
+        Returns:
+            Repositories sorted best first
+        """
+        velocities = self.velocities(window_hours)
+
+        def sort_key(repo: Dict[str, Any]) -> Tuple[float, float]:
+            velocity, acceleration = velocities.get(self._key(repo), (float('nan'), float('nan')))
+            if velocity == velocity:
+                repo['stars_per_hour'] = round(velocity, 2)
+            if acceleration == acceleration:
+                repo['stars_acceleration'] = round(acceleration, 4)
+            return (
+                -acceleration if acceleration == acceleration else 0.0,
+                -velocity if velocity == velocity else 0.0
+            )
+
+        return sorted(repos, key=sort_key)
@@ -0,0 +1,245 @@
+"""Local rule-based checks of the generated tweets, before any LLM validation."""
+import re
+import unicodedata
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+from ..core.logger import logger, log_step
+
+
+TWEET_MAX_WEIGHT = 280
+
+# Longer summaries are cut with « ... » in the main tweet
+SUMMARY_MAX_LENGTH = 100
+
+# twitter-text v3 configuration: every URL counts as 23, emoji as 2,
+# code points in these ranges as 1 and all others as 2
+URL_WEIGHT = 23
+EMOJI_WEIGHT = 2
+LIGHT_RANGES = ((0, 4351), (8192, 8205), (8208, 8223), (8242, 8247))
+
+URL_RE = re.compile(r'https?://\S+', re.IGNORECASE)
+
+_PICTOGRAPH = '\u2300-\u23ff\u2600-\u27bf\u2b00-\u2bff\U0001F000-\U0001FAFF'
+_MODIFIER = '[\ufe0f\U0001F3FB-\U0001F3FF]?'  # Variation selector or skin tone
+EMOJI_RE = re.compile(
+    '[\U0001F1E6-\U0001F1FF]{2}'  # Flags
+    '|[0-9#*]\ufe0f?\u20e3'  # Keycaps
+    f'|[{_PICTOGRAPH}]{_MODIFIER}(?:\u200d[{_PICTOGRAPH}]{_MODIFIER})*'  # ZWJ sequences count once
+)
+
+HASHTAG_RE = re.compile(r'(?<![\w#])#(\w+)')
+WORD_RE = re.compile(r"[^\W\d_]+")
+TRUNCATED_RE = re.compile(r'(?:\.\.\.|…)\s*$')
+MOJIBAKE_RE = re.compile('\ufffd|\u00c3[\u0080-\u00bf]|\u00e2\u20ac')
+
+# Words that are never correct French without their accents (and not English words)
+ACCENT_LEXICON = {
+    'crez': 'créez', 'creez': 'créez', 'cree': 'crée', 'creer': 'créer',
+    'prsence': 'présence', 'revolutionnaire': 'révolutionnaire',
+    'editeur': 'éditeur', 'fonctionnalite': 'fonctionnalité', 'fonctionnalites': 'fonctionnalités',
+    'donnee': 'donnée', 'donnees': 'données', 'integre': 'intègre', 'integree': 'intégrée',
+    'genere': 'génère', 'generer': 'générer', 'ameliore': 'améliore', 'ameliorer': 'améliorer',
+    'developpeur': 'développeur', 'developpeurs': 'développeurs', 'developpement': 'développement',
+    'deploiement': 'déploiement', 'securite': 'sécurité', 'securise': 'sécurisé',
+    'systeme': 'système', 'systemes': 'systèmes', 'probleme': 'problème', 'problemes': 'problèmes',
+    'reseau': 'réseau', 'reseaux': 'réseaux', 'methode': 'méthode', 'modele': 'modèle',
+    'modeles': 'modèles', 'requete': 'requête', 'requetes': 'requêtes',
+    'bibliotheque': 'bibliothèque', 'acces': 'accès', 'tres': 'très', 'deja': 'déjà',
+    'equipe': 'équipe', 'ecran': 'écran', 'ecrit': 'écrit', 'evenement': 'événement',
+    'efficacite': 'efficacité', 'rapidite': 'rapidité', 'qualite': 'qualité',
+    'interet': 'intérêt', 'leger': 'léger', 'legere': 'légère', 'etre': 'être',
+    'detecter': 'détecter', 'developper': 'développer', 'gerer': 'gérer', 'reduire': 'réduire',
+    'telecharger': 'télécharger', 'precis': 'précis', 'premiere': 'première'
+}
+
+# Function words used to tell an untranslated (English) text from French
+ENGLISH_WORDS = {'the', 'and', 'with', 'for', 'your', 'you', 'is', 'are', 'to', 'of', 'this', 'that', 'from', 'it', 'its', 'into'}
+FRENCH_WORDS = {'le', 'la', 'les', 'des', 'du', 'un', 'une', 'et', 'pour', 'avec', 'vos', 'votre', 'est', 'sont', 'qui', 'dans', 'sur', 'ce', 'cette', 'au', 'aux', 'de'}
+
+# Below this many words of prose the rules cannot judge the content
+MIN_PROSE_WORDS = 6
+
+
+def tweet_weighted_length(text: str) -> int:
+    """
+    Length of a tweet as counted by Twitter (twitter-text v3 weighting).
+
+    The text is NFC-normalized; URLs count as 23, emoji (including ZWJ
+    sequences, flags and skin tones) as 2, Latin and common punctuation as
+    1 and other characters (CJK, symbols) as 2. Only ``http(s)://`` URLs are
+    recognized, the bot never writes bare domains.
+
+    Args:
+        text: Tweet text
+
+    Returns:
+        Weighted length, to compare with 280
+    """
+    return sum(weight for _, weight in _weighted_tokens(unicodedata.normalize('NFC', text)))
+
+
+def truncate_weighted(text: str, max_weight: int) -> str:
+    """
+    Longest start of ``text`` whose weighted length is at most ``max_weight``.
+
+    URLs and emoji sequences are kept whole or dropped, never split.
+
+    Args:
+        text: Text to cut
+        max_weight: Weighted length budget (see tweet_weighted_length)
+
+    Returns:
+        The NFC-normalized text, cut to the budget
+    """
+    kept = []
+    used = 0
+    for token, weight in _weighted_tokens(unicodedata.normalize('NFC', text)):
+        if used + weight > max_weight:
+            break
+        kept.append(token)
+        used += weight
+    return ''.join(kept)
+
+
+def _weighted_tokens(text: str) -> Iterator[Tuple[str, int]]:
+    """Split text into URLs, emoji sequences and single characters with their weight."""
+    position = 0
+    for match in URL_RE.finditer(text):
+        yield from _emoji_tokens(text[position:match.start()])
+        yield match.group(0), URL_WEIGHT
+        position = match.end()
+    yield from _emoji_tokens(text[position:])
+
+
+def _emoji_tokens(text: str) -> Iterator[Tuple[str, int]]:
+    position = 0
+    for match in EMOJI_RE.finditer(text):
+        yield from _char_tokens(text[position:match.start()])
+        yield match.group(0), EMOJI_WEIGHT
+        position = match.end()
+    yield from _char_tokens(text[position:])
+
+
+def _char_tokens(text: str) -> Iterator[Tuple[str, int]]:
+    for char in text:
+        yield char, 1 if any(low <= ord(char) <= high for low, high in LIGHT_RANGES) else 2
+
+
+class TweetValidator:
+    """Mechanical checks of the main tweet and its reply.
+
+    Errors (weighted length over 280, truncation artifacts, missing accents,
+    broken URLs, duplicate hashtags, mojibake) make the tweets invalid. When
+    no error is found but the text is too short or reads as English, the
+    rules are inconclusive and the caller asks the LLM.
+    """
+
+    def validate(
+        self,
+        main_tweet: str,
+        reply_tweet: str,
+        repo_url: Optional[str] = None,
+        generated: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Check both tweets.
+
+        Args:
+            main_tweet: Main tweet text
+            reply_tweet: Reply tweet text
+            repo_url: Repository URL the reply must contain
+            generated: AI-generated texts (summary, features). Missing accents are
+                only looked for in them, never in the repository name or
+                description; without them (tweets rewritten by the correction)
+                the tweets are scanned, skipping the words of the repository name
+
+        Returns:
+            {'is_valid', 'conclusive', 'message', 'issues', 'provider': 'local'};
+            ``message`` uses the LLM validation format (``VALIDE`` / ``ERREUR: ...``)
+        """
+        name_words = {word.lower() for word in WORD_RE.findall(urlparse(repo_url).path)} if repo_url else set()
+        issues = []
+        for label, text in (("tweet principal", main_tweet), ("tweet réponse", reply_tweet)):
+            issues.extend(f"{label} : {issue}" for issue in self._check_tweet(text))
+            if generated is None:
+                issues.extend(f"{label} : {issue}" for issue in self._check_accents(URL_RE.sub(' ', text), name_words))
+        if generated is not None:
+            issues.extend(f"texte généré : {issue}" for issue in self._check_accents('\n'.join(generated), name_words))
+        if repo_url and repo_url not in reply_tweet:
+            issues.append("tweet réponse : lien du projet absent")
+
+        doubts = self._doubts(f"{main_tweet}\n{reply_tweet}") if not issues else []
+        result = {
+            'is_valid': not issues,
+            'conclusive': not doubts,
+            'message': f"ERREUR: {'; '.join(issues)}" if issues else ("INCERTAIN: " + '; '.join(doubts) if doubts else "VALIDE"),
+            'issues': issues,
+            'provider': 'local'
+        }
+        logger.info(
+            "Local tweet validation completed",
+            **log_step("tweet_local_validation", valid=result['is_valid'], conclusive=result['conclusive'],
+                       issues=issues, doubts=doubts)
+        )
+        return result
+
+    def _check_tweet(self, text: str) -> List[str]:
+        if not text.strip():
+            return ["texte vide"]
+        issues = []
+
+        length = tweet_weighted_length(text)
+        if length > TWEET_MAX_WEIGHT:
+            issues.append(f"trop long ({length}/{TWEET_MAX_WEIGHT})")
+
+        urls = URL_RE.findall(text)
+        prose = URL_RE.sub(' ', text)
+        if any(TRUNCATED_RE.search(line) for line in prose.splitlines()):
+            issues.append("texte tronqué (« ... »)")
+
+        if MOJIBAKE_RE.search(text):
+            issues.append("caractères mal encodés")
+
+        broken = [url for url in urls if not self._is_valid_url(url)]
+        if broken:
+            issues.append(f"lien cassé ({', '.join(broken)})")
+
+        tags = Counter(tag.lower() for tag in HASHTAG_RE.findall(text))
+        duplicates = sorted(f"#{tag}" for tag, count in tags.items() if count > 1)
+        if duplicates:
+            issues.append(f"hashtags en double ({', '.join(duplicates)})")
+        return issues
+
+    @staticmethod
+    def _check_accents(text: str, skip: Set[str]) -> List[str]:
+        missing = sorted({
+            ACCENT_LEXICON[word.lower()] for word in WORD_RE.findall(HASHTAG_RE.sub(' ', text))
+            if word.lower() in ACCENT_LEXICON and word.lower() not in skip
+        })
+        return [f"accents manquants ({', '.join(missing)})"] if missing else []
+
+    @staticmethod
+    def _is_valid_url(url: str) -> bool:
+        if TRUNCATED_RE.search(url) or '…' in url:
+            return False
+        if url.count('(') != url.count(')'):
+            return False
+        parsed = urlparse(url)
+        host = parsed.hostname or ''
+        return parsed.scheme in ('http', 'https') and '.' in host and not host.endswith('.')
+
+    @staticmethod
+    def _doubts(text: str) -> List[str]:
+        """Reasons the rules cannot conclude (the LLM checks the language and the content)."""
+        prose = HASHTAG_RE.sub(' ', URL_RE.sub(' ', text))
+        words = [word.lower() for word in WORD_RE.findall(prose)]
+        doubts = []
+        if len(words) < MIN_PROSE_WORDS:
+            doubts.append("texte trop court pour être jugé")
+        english = sum(word in ENGLISH_WORDS for word in words)
+        french = sum(word in FRENCH_WORDS for word in words)
+        if english >= 2 and english > french:
+            doubts.append("texte possiblement en anglais")
+        return doubts
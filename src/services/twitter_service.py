@@ -6,6 +6,7 @@ import time
 
 from ..core.config import settings
 from ..core.logger import logger, log_step
+from .tweet_validator import SUMMARY_MAX_LENGTH, TWEET_MAX_WEIGHT, truncate_weighted, tweet_weighted_length
 
 
 class TwitterService:
@@ -14,6 +15,7 @@ class TwitterService:
     def __init__(self):
         self.client: Optional[tweepy.Client] = None
         self.firefox_service = None
+        self.last_post_channel: Optional[str] = None  # "api" or "firefox", for history analytics
         self._setup_client()
     
     def _has_oauth1_credentials(self) -> bool:
@@ -140,6 +142,7 @@ class TwitterService:
                         "Tweet created successfully via API",
                         **log_step("tweet_api_success", tweet_id=tweet_id, attempt=attempt+1)
                     )
+                    self.last_post_channel = "api"
                     return tweet_id
                 
             except Exception as e:
@@ -173,6 +176,7 @@ class TwitterService:
                             "Tweet created successfully via Firefox",
                             **log_step("tweet_firefox_success", tweet_id=tweet_id)
                         )
+                        self.last_post_channel = "firefox"
                         return tweet_id
                     else:
                         logger.error("Firefox tweet creation failed", **log_step("tweet_firefox_failed"))
@@ -283,7 +287,7 @@ class TwitterService:
         hashtags = "\n#GitHub"
         
         # Smart truncation to avoid cutting words
-        max_summary = 100
+        max_summary = SUMMARY_MAX_LENGTH
         if len(summary) > max_summary:
             truncated = summary[:max_summary-3]
             last_space = truncated.rfind(' ')
@@ -294,11 +298,12 @@ class TwitterService:
         
         tweet_text = f"{base_text}\n\n{summary}{hashtags}"
         
-        # Final safety check - max 200 chars total with smart truncation
-        if len(tweet_text) > 280:
-            available_space = 280 - len(base_text) - len(hashtags) - 4  # 4 for \n\n
+        # Final safety check - Twitter weighted length (emoji count 2) with smart truncation
+        if tweet_weighted_length(tweet_text) > TWEET_MAX_WEIGHT:
+            available_space = TWEET_MAX_WEIGHT - tweet_weighted_length(f"{base_text}\n\n{hashtags}")
             if available_space > 20:
-                truncated = summary[:available_space-3]
+                # Cut on the weighted length: CJK characters and emoji count 2
+                truncated = truncate_weighted(summary, available_space - 3)
                 last_space = truncated.rfind(' ')
                 if last_space > 15:
                     summary = truncated[:last_space] + "..."
@@ -309,6 +314,7 @@ class TwitterService:
             
             tweet_text = f"{base_text}\n\n{summary}{hashtags}"
         
+        assert tweet_weighted_length(tweet_text) <= TWEET_MAX_WEIGHT, "main tweet over the weighted length limit"
         return tweet_text
     
     def create_reply_text(self, repo_data: Dict[str, Any], features: list[str], url: str) -> str:
@@ -331,8 +337,8 @@ class TwitterService:
         
         base_text = f"{features_text}\n\nLien: {url}\n#Code"
         
-        # Ensure reply stays under 280 characters
-        if len(base_text) > 280:
+        # Ensure reply stays under 280 (weighted: the URL counts as 23)
+        if tweet_weighted_length(base_text) > TWEET_MAX_WEIGHT:
             # Truncate features if needed
             features_text = "\n".join([f"• {feature}" for feature in features[:2]])
             base_text = f"📌 {description}\n\n{features_text}\n\n🔗 {url}\n#Code"